@@ -37,21 +37,37 @@ added_data.extend(collect_data_files('webdriver_manager'))
 
 # Recopilar submódulos
 hidden_imports = collect_submodules('webdriver_manager')
-hidden_imports.extend(['selenium', 'requests', 'PyQt5'])
+# El motor, Selenium y webdriver_manager se importan dentro de funciones (al iniciar una
+# descarga), así que se declaran aquí para que el análisis los incluya
+hidden_imports.extend(['selenium', 'requests', 'bs4', 'PyQt5',
+                       'cremil_downloader.engine', 'cremil_downloader.gui', 'cremil_downloader.cli',
+                       'cremil_downloader.pipeline', 'webdriver_manager.chrome'])
+
+# Módulos que la aplicación no usa: reducen el tamaño del paquete y lo que hay que
+# extraer y cargar al arrancar
+excluded_modules = [
+    'tkinter', 'unittest', 'pydoc_data', 'lxml', 'html5lib',
+    'PyQt5.QtWebEngine', 'PyQt5.QtWebEngineCore', 'PyQt5.QtWebEngineWidgets', 'PyQt5.QtWebKit',
+    'PyQt5.QtQml', 'PyQt5.QtQuick', 'PyQt5.QtQuickWidgets', 'PyQt5.QtMultimedia',
+    'PyQt5.QtMultimediaWidgets', 'PyQt5.QtNetwork', 'PyQt5.QtSql', 'PyQt5.QtTest',
+    'PyQt5.QtBluetooth', 'PyQt5.QtOpenGL', 'PyQt5.QtPositioning', 'PyQt5.QtLocation',
+    'PyQt5.QtSensors', 'PyQt5.QtSerialPort', 'PyQt5.QtXml', 'PyQt5.QtXmlPatterns',
+    'PyQt5.QtSvg', 'PyQt5.QtDBus', 'PyQt5.QtDesigner', 'PyQt5.QtHelp',
+]
 
 # Lista de archivos adicionales a incluir
 added_files = [('icon.ico', '.')]
 
 a = Analysis(
-    ['cremil_downloader.py'],
-    pathex=[],
+    ['cremil_downloader/__main__.py'],
+    pathex=['.'],
     binaries=[],
     datas=added_data + added_files,
     hiddenimports=hidden_imports,
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=excluded_modules,
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -59,18 +75,20 @@ a = Analysis(
 )
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
+# Distribución en un directorio (onedir): un ejecutable de un solo archivo extrae
+# todo su contenido a una carpeta temporal en cada arranque, lo que retrasa la
+# apertura de la ventana varios segundos. Sin UPX las bibliotecas no se descomprimen
+# al cargarse.
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='CREMIL Descarga Comprobantes',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=False,
     upx_exclude=[],
     runtime_tmpdir=None,
     console=False,
@@ -80,4 +98,15 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
     icon='icon.ico',  # Cambiar por tu archivo de icono
-)
\ No newline at end of file
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='CREMIL Descarga Comprobantes',
+)
@@ -0,0 +1,8 @@
+"""
+Descarga automatizada de comprobantes de pago del portal de CREMIL.
+
+Módulos:
+    engine: motor de descarga (Selenium + HTTP), sin dependencias de Qt
+    gui: interfaz gráfica PyQt5
+    cli: línea de comandos para servidores sin pantalla
+"""
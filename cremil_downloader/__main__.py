@@ -0,0 +1,24 @@
+"""
+Punto de entrada: ``python -m cremil_downloader``.
+
+Sin argumentos abre la interfaz gráfica; con argumentos ejecuta la línea de
+comandos, que no importa PyQt5.
+"""
+import multiprocessing
+import sys
+
+
+def main():
+    # Necesario para el grupo de procesos del modo por lotes en el ejecutable congelado
+    multiprocessing.freeze_support()
+    
+    if len(sys.argv) > 1:
+        from cremil_downloader.cli import main as cli_main
+        sys.exit(cli_main())
+    
+    from cremil_downloader.gui import main as gui_main
+    gui_main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Registro de actividad con entrega por lotes a la interfaz gráfica.
+
+El hilo de descarga añade los mensajes sin esperar a la interfaz: cada mensaje
+se escribe en un archivo rotativo y queda pendiente en una cola acotada que la
+interfaz vacía en cada tick de un QTimer, de modo que un lote de mensajes se
+muestra con una sola actualización del registro. La vista solo conserva las
+últimas líneas; las anteriores siguen disponibles en el archivo.
+
+No depende de Qt.
+"""
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+# Archivo del registro completo (fuera del directorio de descarga)
+LOG_PATH = os.path.join(os.path.expanduser("~"), ".cremil_downloader", "registro_actividad.log")
+
+# Tamaño máximo de cada archivo del registro y copias anteriores que se conservan
+LOG_FILE_MAX_BYTES = 1024 * 1024
+LOG_FILE_BACKUPS = 3
+
+# Líneas que conserva la vista del registro
+MAX_VIEW_LINES = 2000
+
+
+class ActivityLog:
+    """
+    Cola de mensajes pendientes de mostrar, con copia en un archivo rotativo.
+    
+    Es seguro entre hilos: append() se llama desde el hilo de descarga y drain()
+    desde la interfaz.
+    
+    Args:
+        path: Ruta del archivo del registro (None para no escribir archivo)
+        max_lines: Mensajes pendientes que se conservan si la interfaz no los recoge
+    """
+
+    def __init__(self, path=LOG_PATH, max_lines=MAX_VIEW_LINES):
+        self.pending = deque(maxlen=max_lines)
+        self.lock = threading.Lock()
+        self.handler = None
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self.handler = RotatingFileHandler(path, maxBytes=LOG_FILE_MAX_BYTES,
+                                                   backupCount=LOG_FILE_BACKUPS, encoding="utf-8", delay=True)
+            except OSError:
+                self.handler = None
+
+    def append(self, message):
+        """
+        Añade un mensaje con la hora actual.
+        """
+        now = datetime.now()
+        line = f"[{now.strftime('%H:%M:%S')}] {message}"
+        with self.lock:
+            self.pending.append(line)
+        if self.handler is not None:
+            self.handler.handle(logging.makeLogRecord({"msg": f"{now.strftime('%Y-%m-%d')} {line}"}))
+
+    def drain(self):
+        """
+        Devuelve y retira los mensajes pendientes.
+        """
+        with self.lock:
+            lines = list(self.pending)
+            self.pending.clear()
+        return lines
+
+    def close(self):
+        if self.handler is not None:
+            self.handler.close()
+            self.handler = None
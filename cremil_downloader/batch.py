@@ -0,0 +1,212 @@
+"""
+Modo por lotes: descarga los comprobantes de varias identificaciones en paralelo.
+
+Cada cuenta se procesa en un proceso del grupo con su propio navegador (puerto
+de depuración único) y guarda sus archivos en un subdirectorio con su número de
+identificación. Cada proceso conserva su navegador iniciado para la siguiente
+cuenta que procese, tras borrar las cookies, la caché y el almacenamiento del
+portal de la anterior y cerrar sus pestañas. Al terminar se escribe un resumen del
+lote en JSON y CSV.
+
+Archivo de cuentas (CSV con encabezado o JSON con una lista de objetos):
+    identificacion,usuario,contrasena,desde,hasta
+    12345678,12345678,secreto,2024-01,2025-12
+
+Las columnas usuario y contrasena son opcionales; si faltan se usan las
+credenciales por defecto (variables de entorno de la línea de comandos).
+"""
+import csv
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from multiprocessing import util
+
+from cremil_downloader.browser_pool import BrowserPool
+
+# Navegadores simultáneos por defecto (cada uno es un proceso de Chrome)
+DEFAULT_BATCH_WORKERS = 2
+
+# Resumen del lote dentro del directorio base
+SUMMARY_BASENAME = "resumen_lote"
+
+# Columnas del resumen CSV
+SUMMARY_FIELDS = ["identificacion", "desde", "hasta", "ok", "found", "selected", "skipped",
+                  "downloaded", "failed", "seconds", "error", "download_dir"]
+
+
+# Grupo de navegadores del proceso del lote (uno por proceso, reutilizado entre cuentas)
+_worker_browser_pool = None
+
+
+def worker_browser_pool():
+    """
+    Devuelve el grupo de navegadores del proceso actual; se cierra al terminar el proceso.
+    """
+    global _worker_browser_pool
+    if _worker_browser_pool is None:
+        _worker_browser_pool = BrowserPool(max_idle=1)
+        # Los procesos del grupo terminan sin ejecutar atexit; Finalize sí se ejecuta
+        util.Finalize(None, _worker_browser_pool.close, exitpriority=10)
+    return _worker_browser_pool
+
+
+def parse_year_month(value):
+    """
+    Convierte un texto AAAA-MM en una tupla (año, mes).
+    """
+    date = datetime.strptime(value.strip(), "%Y-%m")
+    return date.year, date.month
+
+
+def load_accounts(path):
+    """
+    Lee el archivo de cuentas del lote (CSV o JSON según la extensión).
+    
+    Returns:
+        Lista de diccionarios con identificacion, usuario, contrasena, desde y hasta
+    """
+    with open(path, encoding='utf-8-sig') as f:
+        if path.lower().endswith(".json"):
+            rows = json.load(f)
+            if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                raise ValueError(f"{path}: el archivo JSON debe contener una lista de objetos (uno por cuenta)")
+        else:
+            rows = list(csv.DictReader(f))
+    
+    accounts = []
+    for line, row in enumerate(rows, 1):
+        # En JSON los valores pueden ser números (por ejemplo, la identificación)
+        row = {str(key).strip().lower(): str(value).strip() if value is not None else ""
+               for key, value in row.items() if key}
+        missing = [field for field in ("identificacion", "desde", "hasta") if not row.get(field)]
+        if missing:
+            raise ValueError(f"Cuenta {line} de {path}: faltan los campos {', '.join(missing)}")
+        if parse_year_month(row["desde"]) > parse_year_month(row["hasta"]):
+            raise ValueError(f"Cuenta {line} de {path}: desde debe ser anterior o igual a hasta")
+        accounts.append(row)
+    return accounts
+
+
+def run_account(account, base_dir, engine_options):
+    """
+    Descarga los comprobantes de una cuenta. Se ejecuta en un proceso del grupo.
+    
+    Returns:
+        Diccionario con el resultado y los contadores de la cuenta
+    """
+    identificacion = account["identificacion"]
+    (year_from, month_from) = parse_year_month(account["desde"])
+    (year_to, month_to) = parse_year_month(account["hasta"])
+    download_dir = os.path.join(base_dir, identificacion)
+
+    def log(message):
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] [{identificacion}] {message}", flush=True)
+    
+    # El motor se importa en el proceso del grupo; el proceso principal no lo necesita
+    from cremil_downloader.engine import DownloadEngine
+    engine = DownloadEngine(
+        identificacion=identificacion,
+        username=account["usuario"],
+        password=account["contrasena"],
+        year_from=year_from,
+        year_to=year_to,
+        month_from=month_from,
+        month_to=month_to,
+        download_dir=download_dir,
+        browser_pool=worker_browser_pool(),
+        on_status=log,
+        **engine_options
+    )
+    
+    result = {"identificacion": identificacion, "desde": account["desde"], "hasta": account["hasta"],
+              "download_dir": download_dir, "ok": False, "error": ""}
+    start_time = time.time()
+    try:
+        engine.run()
+        # Una cuenta con comprobantes sin descargar no se da por completada
+        result["ok"] = not engine.stats["failed"]
+        if engine.stats["failed"]:
+            result["error"] = f"{engine.stats['failed']} comprobantes sin descargar"
+    except Exception as e:
+        log(f"Error durante la ejecución: {str(e)}\n{traceback.format_exc()}")
+        result["error"] = str(e).strip()
+    
+    result.update(engine.stats)
+    result["seconds"] = round(time.time() - start_time, 1)
+    return result
+
+
+def write_summary(results, base_dir):
+    """
+    Escribe el resumen del lote (resumen_lote.json y resumen_lote.csv) y devuelve la ruta del JSON.
+    """
+    totals = {key: sum(result.get(key, 0) for result in results)
+              for key in ("found", "selected", "skipped", "downloaded", "failed")}
+    totals["accounts"] = len(results)
+    totals["failed_accounts"] = sum(1 for result in results if not result["ok"])
+    
+    json_path = os.path.join(base_dir, f"{SUMMARY_BASENAME}.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump({"generated": datetime.now().isoformat(timespec="seconds"),
+                   "totals": totals, "accounts": results}, f, ensure_ascii=False, indent=2)
+    
+    csv_path = os.path.join(base_dir, f"{SUMMARY_BASENAME}.csv")
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+    
+    return json_path
+
+
+def run_batch(accounts, base_dir, workers=DEFAULT_BATCH_WORKERS, username=None, password=None,
+              on_status=None, **engine_options):
+    """
+    Procesa todas las cuentas con un grupo de procesos y escribe el resumen del lote.
+    
+    Args:
+        accounts: Cuentas devueltas por load_accounts
+        base_dir: Directorio base; cada cuenta descarga en base_dir/identificacion
+        workers: Número de navegadores simultáneos
+        username, password: Credenciales para las cuentas que no las definen
+        on_status: Callback para los mensajes del lote
+        engine_options: Opciones adicionales de DownloadEngine (modo, concurrencia, etc.)
+    
+    Returns:
+        Lista de resultados por cuenta, en el orden del archivo
+    """
+    def status(message):
+        if on_status is not None:
+            on_status(message)
+    
+    os.makedirs(base_dir, exist_ok=True)
+    for account in accounts:
+        account["usuario"] = account.get("usuario") or username or ""
+        account["contrasena"] = account.get("contrasena") or password or ""
+        if not account["usuario"] or not account["contrasena"]:
+            raise ValueError(f"La cuenta {account['identificacion']} no tiene credenciales")
+    
+    status(f"Procesando {len(accounts)} cuentas con {workers} navegadores simultáneos...")
+    results = [None] * len(accounts)
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(run_account, account, base_dir, engine_options): idx
+                   for idx, account in enumerate(accounts)}
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                results[idx] = future.result()
+            except Exception as e:
+                # El proceso del grupo terminó de forma inesperada
+                account = accounts[idx]
+                results[idx] = {"identificacion": account["identificacion"], "desde": account["desde"],
+                                "hasta": account["hasta"], "ok": False, "error": str(e)}
+            result = results[idx]
+            status(f"Cuenta {result['identificacion']}: {'completada' if result['ok'] else 'con errores'} "
+                   f"({result.get('downloaded', 0)} descargados, {result.get('failed', 0)} fallidos)")
+    
+    summary_path = write_summary(results, base_dir)
+    status(f"Resumen del lote guardado en: {summary_path}")
+    return results
@@ -0,0 +1,331 @@
+"""
+Medición de rendimiento del motor de descarga contra el portal simulado.
+
+Levanta un MockPortal local y ejecuta el motor una vez por modo de descarga,
+cada una en un proceso nuevo para medir su memoria por separado. Informa
+comprobantes por segundo, la latencia por comprobante (p50 y p95) y el pico de
+memoria residente del proceso.
+
+Modos:
+    sesion_guardada  sin navegador, con una sesión guardada válida (solo HTTP)
+    http             inicio de sesión con el navegador y descargas por HTTP
+    navegador        inicio de sesión y descargas con el navegador
+
+Con --startup mide en cambio el arranque: el tiempo de importar cada módulo del
+paquete y el de mostrar la ventana de la interfaz, cada medición en un
+intérprete nuevo, e indica qué dependencias pesadas quedaron cargadas.
+
+Uso:
+    python -m cremil_downloader.benchmark --rows 120 --latency 0.1 --error-rate 0.02
+    python -m cremil_downloader.benchmark --startup
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import requests
+
+from cremil_downloader.mock_portal import MockPortal
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCHMARK_MODES = ["sesion_guardada", "http", "navegador"]
+
+# Etapas del informe de métricas que corresponden a un comprobante
+RECEIPT_STAGES = ("comprobante_http", "comprobante_navegador")
+
+# Credenciales del portal simulado (acepta cualquiera)
+MOCK_USERNAME = "usuario"
+MOCK_PASSWORD = "clave"
+
+# Módulos cuyo tiempo de importación se mide con --startup
+STARTUP_MODULES = ["cremil_downloader.gui", "cremil_downloader.cli", "cremil_downloader.engine"]
+
+# Dependencias que no deberían cargarse hasta que empieza una descarga
+HEAVY_MODULES = ["selenium", "requests", "bs4", "webdriver_manager"]
+
+# Programa que se ejecuta en un intérprete nuevo para medir una importación
+STARTUP_IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+# Programa que mide el tiempo hasta que la ventana de la interfaz queda visible
+STARTUP_WINDOW_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+from cremil_downloader.gui import CremilApp
+app = QApplication(sys.argv)
+window = CremilApp()
+window.show()
+app.processEvents()
+seconds = time.perf_counter() - start
+loaded = [name for name in {heavy!r} if name in sys.modules]
+window.close()
+print(json.dumps({{"seconds": seconds, "loaded": loaded}}))
+"""
+
+
+def percentile(values, pct):
+    """
+    Percentil por rango más cercano; None si no hay valores.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def peak_rss_mb():
+    """
+    Pico de memoria residente del proceso y sus hijos ya terminados, en MB (None si no se puede medir).
+    """
+    if resource is None:
+        return None
+    peak = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def run_mode(mode, portal_url, concurrency, headless):
+    """
+    Ejecuta el motor una vez en el modo indicado. Se ejecuta en un proceso propio.
+    
+    Returns:
+        Diccionario con las mediciones del modo
+    """
+    # La URL del portal se lee al importar el motor
+    os.environ["CREMIL_PORTAL_URL"] = portal_url
+    from cremil_downloader.engine import DownloadEngine
+    from cremil_downloader.options import MODE_BROWSER, MODE_HTTP
+    from cremil_downloader.session_cache import SessionCache
+    from cremil_downloader.session_cache import is_available as session_cache_available
+    
+    download_dir = tempfile.mkdtemp(prefix=f"cremil_benchmark_{mode}_")
+    cache_dir = tempfile.mkdtemp(prefix="cremil_benchmark_sesion_")
+    engine = DownloadEngine(
+        identificacion="1",
+        username=MOCK_USERNAME,
+        password=MOCK_PASSWORD,
+        year_from=1900,
+        year_to=2999,
+        month_from=1,
+        month_to=12,
+        download_dir=download_dir,
+        headless=headless,
+        download_delay=0,
+        download_mode=MODE_BROWSER if mode == "navegador" else MODE_HTTP,
+        concurrency=concurrency,
+        incremental=False,
+        session_cache=mode == "sesion_guardada",
+    )
+    
+    result = {"mode": mode, "error": ""}
+    try:
+        if mode == "sesion_guardada":
+            if not session_cache_available():
+                raise RuntimeError("el paquete 'cryptography' no está instalado")
+            # Iniciar sesión por HTTP y guardar la sesión como lo haría una ejecución anterior
+            with requests.Session() as session:
+                session.post(f"{portal_url}/utils/login", data={"usuario": MOCK_USERNAME})
+                cookies = [{"name": cookie.name, "value": cookie.value, "domain": cookie.domain,
+                            "path": cookie.path} for cookie in session.cookies]
+            engine.session_cache = SessionCache(cache_dir=cache_dir)
+            engine.session_cache.save(MOCK_USERNAME, MOCK_PASSWORD, cookies, "cremil-benchmark")
+        
+        start_time = time.perf_counter()
+        try:
+            engine.run()
+        except Exception as e:
+            result["error"] = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+        seconds = time.perf_counter() - start_time
+    except Exception as e:
+        result["error"] = str(e)
+        seconds = 0
+    finally:
+        shutil.rmtree(download_dir, ignore_errors=True)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    
+    latencies = [span["seconds"] for span in engine.metrics.spans if span["stage"] in RECEIPT_STAGES]
+    result.update({
+        "seconds": round(seconds, 3),
+        "downloaded": engine.stats["downloaded"],
+        "failed": engine.stats["failed"],
+        "receipts_per_second": round(engine.stats["downloaded"] / seconds, 2) if seconds else None,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "peak_rss_mb": peak_rss_mb(),
+        "bytes": engine.metrics.bytes,
+    })
+    return result
+
+
+def run_benchmark(modes=None, rows=24, latency=0.0, error_rate=0.0, truncate_rate=0.0, pdf_size=50 * 1024,
+                  listing_latency=0.0, session_pdfs=None, concurrency=4, headless=True, seed=0):
+    """
+    Ejecuta la medición de cada modo contra un portal simulado nuevo.
+    
+    Returns:
+        Lista de resultados por modo
+    """
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for mode in modes or BENCHMARK_MODES:
+        portal = MockPortal(rows=rows, latency=latency, error_rate=error_rate, truncate_rate=truncate_rate,
+                            pdf_size=pdf_size, listing_latency=listing_latency, session_pdfs=session_pdfs,
+                            seed=seed).start()
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(run_mode, mode, portal.base_url, concurrency, headless).result()
+        finally:
+            portal.stop()
+        result["portal_requests"] = dict(portal.requests)
+        results.append(result)
+    return results
+
+
+def measure_startup(script, repeat=3):
+    """
+    Ejecuta script en un intérprete nuevo repeat veces y devuelve la mejor medición.
+    
+    Returns:
+        Diccionario con seconds (el menor tiempo), process_seconds (el menor tiempo del
+        proceso completo, con el arranque del intérprete), loaded (dependencias pesadas
+        cargadas) y error
+    """
+    env = dict(os.environ)
+    # Sin pantalla (servidores de integración) Qt necesita la plataforma offscreen
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    best = {"seconds": None, "process_seconds": None, "loaded": [], "error": None}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=env)
+        process_seconds = time.perf_counter() - start
+        if completed.returncode != 0:
+            best["error"] = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "error"
+            break
+        measured = json.loads(completed.stdout.strip().splitlines()[-1])
+        if best["seconds"] is None or measured["seconds"] < best["seconds"]:
+            best["seconds"] = measured["seconds"]
+            best["loaded"] = measured["loaded"]
+        if best["process_seconds"] is None or process_seconds < best["process_seconds"]:
+            best["process_seconds"] = process_seconds
+    return best
+
+
+def run_startup_benchmark(repeat=3):
+    """
+    Mide la importación de cada módulo de STARTUP_MODULES y la apertura de la ventana.
+    
+    Returns:
+        Lista de resultados por medición
+    """
+    results = []
+    for module in STARTUP_MODULES:
+        result = measure_startup(STARTUP_IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES), repeat)
+        result["target"] = f"import {module}"
+        results.append(result)
+    result = measure_startup(STARTUP_WINDOW_SCRIPT.format(heavy=HEAVY_MODULES), repeat)
+    result["target"] = "ventana visible"
+    results.append(result)
+    return results
+
+
+def format_startup_results(results):
+    """
+    Devuelve los resultados del arranque como una tabla de texto.
+    """
+    def show(value):
+        return "-" if value is None else f"{value * 1000:.0f}"
+    
+    lines = [f"{'medición':<36} {'ms':>6} {'proc ms':>8}  dependencias pesadas cargadas"]
+    for result in results:
+        loaded = result["error"] or ", ".join(result["loaded"]) or "ninguna"
+        lines.append(f"{result['target']:<36} {show(result['seconds']):>6} {show(result['process_seconds']):>8}  {loaded}")
+    return "\n".join(lines)
+
+
+def format_results(results):
+    """
+    Devuelve los resultados como una tabla de texto.
+    """
+    def show(value, pattern):
+        return "-" if value is None else pattern.format(value)
+    
+    lines = [f"{'modo':<16} {'seg':>8} {'ok':>5} {'fallo':>5} {'comp/s':>8} {'p50 s':>7} {'p95 s':>7} {'RSS MB':>7}  error"]
+    for result in results:
+        lines.append(f"{result['mode']:<16} {result['seconds']:>8.2f} {result['downloaded']:>5} {result['failed']:>5} "
+                     f"{show(result['receipts_per_second'], '{:.2f}'):>8} {show(result['p50'], '{:.3f}'):>7} "
+                     f"{show(result['p95'], '{:.3f}'):>7} {show(result['peak_rss_mb'], '{:.1f}'):>7}  {result['error']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m cremil_downloader.benchmark",
+        description="Mide el rendimiento del motor de descarga contra un portal de CREMIL simulado."
+    )
+    parser.add_argument("--modes", default=",".join(BENCHMARK_MODES),
+                        help=f"Modos separados por comas ({', '.join(BENCHMARK_MODES)})")
+    parser.add_argument("--rows", type=int, default=24, help="Comprobantes en la tabla del portal")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latencia de cada PDF en segundos")
+    parser.add_argument("--listing-latency", type=float, default=0.0, help="Latencia de la tabla en segundos")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Proporción de PDF que responden con error 500")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="Proporción de PDF enviados incompletos")
+    parser.add_argument("--session-pdfs", type=int, help="Cerrar la sesión del portal cada N PDF servidos")
+    parser.add_argument("--pdf-kb", type=int, default=50, help="Tamaño de cada PDF en KB")
+    parser.add_argument("--concurrency", type=int, default=4, help="Descargas HTTP simultáneas")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de los errores simulados")
+    parser.add_argument("--visible", action="store_true", help="Mostrar la ventana del navegador")
+    parser.add_argument("--startup", action="store_true",
+                        help="Medir el tiempo de importación y de apertura de la ventana en lugar de las descargas")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones de cada medición de --startup")
+    parser.add_argument("--output", help="Guardar los resultados en un archivo JSON")
+    args = parser.parse_args(argv)
+    
+    if args.startup:
+        results = run_startup_benchmark(max(1, args.repeat))
+        print(format_startup_results(results))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+            print(f"Resultados guardados en: {args.output}")
+        return 0 if all(not result["error"] for result in results) else 1
+    
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = [mode for mode in modes if mode not in BENCHMARK_MODES]
+    if unknown:
+        parser.error(f"modos desconocidos: {', '.join(unknown)}")
+    
+    results = run_benchmark(modes, rows=args.rows, latency=args.latency, error_rate=args.error_rate,
+                            truncate_rate=args.truncate_rate,
+                            pdf_size=args.pdf_kb * 1024, listing_latency=args.listing_latency,
+                            session_pdfs=args.session_pdfs,
+                            concurrency=args.concurrency, headless=not args.visible, seed=args.seed)
+    print(format_results(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"Resultados guardados en: {args.output}")
+    return 0 if all(not result["error"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+Resolución en caché de chromedriver y grupo de navegadores reutilizables.
+
+ChromeDriverManager().install() puede consultar la red para averiguar la versión
+del driver en cada ejecución. resolve_driver_path() guarda la ruta resuelta en
+~/.cremil_downloader/chromedriver.json y la reutiliza mientras el archivo exista
+y no haya caducado; si no hay conexión se usa la última ruta conocida. Si Chrome
+se actualizó y ya no acepta el driver guardado, forget_driver_path() descarta la
+ruta y el siguiente resolve_driver_path() vuelve a consultar webdriver_manager.
+
+BrowserPool conserva navegadores ya iniciados entre trabajos consecutivos (la
+interfaz gráfica y cada proceso del modo por lotes tienen el suyo), de modo que
+solo el primer trabajo paga el arranque de Chrome. Al devolver un navegador se
+borran sus cookies, su caché y el almacenamiento (localStorage, IndexedDB...) de
+los orígenes indicados, y sus pestañas se reemplazan por una nueva en blanco (con
+ellas desaparece sessionStorage), de modo que una cuenta no hereda nada de la
+anterior aunque compartan navegador.
+"""
+import json
+import os
+import threading
+import time
+
+# Ruta de chromedriver resuelta (fuera del directorio de descarga)
+DRIVER_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cremil_downloader", "chromedriver.json")
+
+# Vigencia de la ruta resuelta antes de volver a consultar webdriver_manager (en segundos)
+DRIVER_CACHE_TTL = 7 * 24 * 3600
+
+# Navegadores sin usar que conserva el grupo y tiempo máximo que se conservan
+MAX_IDLE_BROWSERS = 2
+IDLE_TIMEOUT = 15 * 60
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def _read_driver_cache():
+    try:
+        with open(DRIVER_CACHE_PATH, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not os.path.isfile(cached.get("path", "")):
+        return None
+    return cached
+
+
+def forget_driver_path():
+    """
+    Descarta la ruta de chromedriver resuelta y guardada (por ejemplo, tras actualizarse Chrome).
+    """
+    global _driver_path
+    with _driver_path_lock:
+        _driver_path = None
+        try:
+            os.remove(DRIVER_CACHE_PATH)
+        except OSError:
+            pass
+
+
+def resolve_driver_path(on_status=None):
+    """
+    Devuelve la ruta de chromedriver, resolviéndola con webdriver_manager solo cuando hace falta.
+    
+    Orden: variable CHROMEDRIVER_PATH, ruta ya resuelta en este proceso, ruta guardada
+    vigente, webdriver_manager y, si este falla (sin conexión), la ruta guardada aunque
+    haya caducado.
+    """
+    global _driver_path
+
+    def status(message):
+        if on_status is not None:
+            on_status(message)
+    
+    if os.environ.get("CHROMEDRIVER_PATH"):
+        return os.environ["CHROMEDRIVER_PATH"]
+    
+    with _driver_path_lock:
+        if _driver_path is not None and os.path.isfile(_driver_path):
+            return _driver_path
+        
+        cached = _read_driver_cache()
+        if cached is not None and time.time() - cached.get("resolved", 0) < DRIVER_CACHE_TTL:
+            _driver_path = cached["path"]
+            status("Usando la ruta de chromedriver guardada")
+            return _driver_path
+        
+        try:
+            # webdriver_manager (y requests) solo se cargan cuando hay que resolver el driver
+            from webdriver_manager.chrome import ChromeDriverManager
+            path = ChromeDriverManager().install()
+        except Exception as e:
+            if cached is None:
+                raise
+            status(f"No se pudo actualizar chromedriver ({str(e)}); se usa la última versión conocida")
+            _driver_path = cached["path"]
+            return _driver_path
+        
+        try:
+            os.makedirs(os.path.dirname(DRIVER_CACHE_PATH), exist_ok=True)
+            temp_path = f"{DRIVER_CACHE_PATH}.part"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"path": path, "resolved": time.time()}, f)
+            os.replace(temp_path, DRIVER_CACHE_PATH)
+        except OSError:
+            pass
+        _driver_path = path
+        return path
+
+
+class BrowserPool:
+    """
+    Conserva navegadores iniciados para reutilizarlos en los trabajos siguientes.
+    
+    Los navegadores se agrupan por una clave con las opciones que no se pueden
+    cambiar una vez iniciado Chrome (modo headless, captura de red, perfil).
+    Es seguro entre hilos.
+    """
+
+    def __init__(self, max_idle=MAX_IDLE_BROWSERS, idle_timeout=IDLE_TIMEOUT):
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.idle = []  # (clave, driver, momento en que se devolvió)
+        self.lock = threading.Lock()
+
+    def acquire(self, key, factory):
+        """
+        Entrega un navegador libre con la clave indicada o crea uno nuevo con factory().
+        
+        Returns:
+            Tupla (driver, reused), con reused=True si el navegador ya estaba iniciado
+        """
+        expired = []
+        driver = None
+        with self.lock:
+            now = time.monotonic()
+            for entry in list(self.idle):
+                if now - entry[2] > self.idle_timeout:
+                    self.idle.remove(entry)
+                    expired.append(entry[1])
+                elif driver is None and entry[0] == key:
+                    self.idle.remove(entry)
+                    driver = entry[1]
+        for stale in expired:
+            self._quit(stale)
+        
+        # Un navegador que se cerró mientras esperaba se reemplaza por uno nuevo
+        if driver is not None and self._is_alive(driver):
+            return driver, True
+        if driver is not None:
+            self._quit(driver)
+        return factory(), False
+
+    def release(self, key, driver, origins=()):
+        """
+        Devuelve un navegador al grupo tras limpiar su sesión; si sobra o no responde, se cierra.
+        
+        Args:
+            key: Clave de opciones del navegador
+            driver: Navegador que se devuelve
+            origins: Orígenes (esquema://host) cuyo almacenamiento se borra
+        """
+        if not self._reset(driver, origins):
+            self._quit(driver)
+            return
+        with self.lock:
+            if len(self.idle) < self.max_idle:
+                self.idle.append((key, driver, time.monotonic()))
+                return
+        self._quit(driver)
+
+    def close(self):
+        """
+        Cierra todos los navegadores libres.
+        """
+        with self.lock:
+            drivers = [entry[1] for entry in self.idle]
+            self.idle = []
+        for driver in drivers:
+            self._quit(driver)
+
+    @staticmethod
+    def _is_alive(driver):
+        try:
+            driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(driver, origins=()):
+        # Dejar una sola pestaña nueva en blanco, sin cookies, caché ni almacenamiento del
+        # portal para el siguiente trabajo (sessionStorage se va con las pestañas cerradas)
+        try:
+            handles = driver.window_handles
+            driver.switch_to.new_window("tab")
+            for handle in handles:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(driver.window_handles[0])
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            for origin in origins:
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
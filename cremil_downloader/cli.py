@@ -0,0 +1,237 @@
+"""
+Línea de comandos para descargar comprobantes de CREMIL sin interfaz gráfica.
+
+Uso:
+    python -m cremil_downloader --id 12345678 --from 2024-01 --to 2025-12
+    python -m cremil_downloader --batch cuentas.csv --workers 3
+
+Las credenciales del portal se leen de las variables de entorno
+CREMIL_USUARIO y CREMIL_CONTRASENA. Este módulo no importa PyQt5, por lo que
+funciona en servidores sin pantalla.
+
+Código de salida: 0 si todo se descargó, 1 si la ejecución falló o quedó algún
+comprobante sin descargar, 2 si los argumentos no son válidos y 130 si se canceló.
+"""
+import argparse
+import os
+import sys
+import traceback
+from datetime import datetime
+
+from cremil_downloader.batch import DEFAULT_BATCH_WORKERS, load_accounts, run_batch
+from cremil_downloader.batch import parse_year_month as parse_account_year_month
+from cremil_downloader.debug_artifacts import DEBUG_LEVELS, DEFAULT_DEBUG_LEVEL
+from cremil_downloader.options import (MODE_HTTP, MODE_BROWSER, DEFAULT_CONCURRENCY, MAX_CONCURRENCY,
+                                       LOG_DETAIL, LOG_INFO)
+from cremil_downloader.planner import index_to_year_month, parse_month_ranges
+
+# Variables de entorno con las credenciales del portal
+ENV_USERNAME = "CREMIL_USUARIO"
+ENV_PASSWORD = "CREMIL_CONTRASENA"
+
+
+def parse_year_month(value):
+    """
+    Convierte un texto AAAA-MM en una tupla (año, mes).
+    """
+    try:
+        return parse_account_year_month(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Fecha inválida '{value}', use el formato AAAA-MM")
+
+
+def month_ranges(value):
+    """
+    Convierte una lista de meses o rangos (AAAA-MM o AAAA-MM:AAAA-MM, separados por comas).
+    """
+    try:
+        return parse_month_ranges(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Meses inválidos '{value}', use AAAA-MM o AAAA-MM:AAAA-MM separados por comas")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m cremil_downloader",
+        description="Descarga los comprobantes de pago de CREMIL en un rango de meses.",
+        epilog=f"Credenciales: variables de entorno {ENV_USERNAME} y {ENV_PASSWORD}.",
+    )
+    parser.add_argument("--id", dest="identificacion",
+                        help="Número de identificación del titular; varias separadas por comas "
+                             "se descargan con un solo inicio de sesión")
+    parser.add_argument("--from", dest="date_from", type=parse_year_month,
+                        metavar="AAAA-MM", help="Primer mes a descargar")
+    parser.add_argument("--to", dest="date_to", type=parse_year_month,
+                        metavar="AAAA-MM", help="Último mes a descargar")
+    parser.add_argument("--months", type=month_ranges, metavar="RANGOS",
+                        help="Meses o rangos a descargar en lugar de --from/--to, "
+                             "p. ej. 2023-01:2023-06,2024-03")
+    parser.add_argument("--nomina", metavar="TIPOS",
+                        help="Tipos de nómina a descargar, separados por comas (por defecto: todos)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Solo mostrar el plan de descarga (cantidad, tamaño y tiempo estimados)")
+    parser.add_argument("--batch", metavar="ARCHIVO",
+                        help="CSV o JSON con varias cuentas (identificacion, usuario, contrasena, desde, hasta)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_BATCH_WORKERS,
+                        help="Navegadores simultáneos en modo por lotes (por defecto: %(default)s)")
+    parser.add_argument("--dir", default="comprobantes", dest="download_dir",
+                        help="Directorio de descarga (por defecto: ./comprobantes); "
+                             "en modo por lotes cada cuenta usa un subdirectorio")
+    parser.add_argument("--mode", choices=[MODE_HTTP, MODE_BROWSER], default=MODE_HTTP,
+                        help="Modo de descarga (por defecto: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Descargas HTTP simultáneas, de 1 a {MAX_CONCURRENCY} (por defecto: %(default)s)")
+    parser.add_argument("--visible", action="store_true",
+                        help="Mostrar la ventana del navegador (requiere pantalla)")
+    parser.add_argument("--no-incremental", action="store_false", dest="incremental",
+                        help="Volver a descargar comprobantes ya registrados en el manifiesto")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reanudar el último trabajo interrumpido con el mismo rango")
+    parser.add_argument("--no-session-cache", action="store_false", dest="session_cache",
+                        help="No reutilizar ni guardar la sesión cifrada del portal")
+    parser.add_argument("--no-listing-cache", action="store_false", dest="listing_cache",
+                        help="Leer siempre la tabla de comprobantes completa del portal")
+    parser.add_argument("--network-capture", action="store_true",
+                        help="En el navegador, tomar el PDF de la respuesta de red (DevTools)")
+    parser.add_argument("--reload-listing", action="store_true",
+                        help="Volver a cargar la página de comprobantes para cada identificación")
+    parser.add_argument("--debug-artifacts", choices=DEBUG_LEVELS, default=DEFAULT_DEBUG_LEVEL,
+                        help="Cuándo guardar capturas de pantalla y HTML de depuración (por defecto: %(default)s)")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="Mostrar también los mensajes de cada paso intermedio")
+    return parser
+
+
+def nomina_types(args):
+    if not args.nomina:
+        return None
+    return [value.strip() for value in args.nomina.split(",") if value.strip()] or None
+
+
+def log(message):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}", flush=True)
+
+
+def run_batch_command(parser, args, username, password):
+    """
+    Ejecuta el modo por lotes y devuelve el código de salida (1 si alguna cuenta falló).
+    """
+    if args.months:
+        parser.error("--months no se puede usar con --batch; el rango de cada cuenta está en el archivo")
+    try:
+        accounts = load_accounts(args.batch)
+    except (OSError, ValueError) as e:
+        parser.error(f"No se pudo leer el archivo de cuentas: {str(e)}")
+    
+    try:
+        results = run_batch(
+            accounts,
+            os.path.abspath(args.download_dir),
+            workers=args.workers,
+            username=username,
+            password=password,
+            on_status=log,
+            headless=not args.visible,
+            download_mode=args.mode,
+            concurrency=args.concurrency,
+            incremental=args.incremental,
+            resume=args.resume,
+            session_cache=args.session_cache,
+            network_capture=args.network_capture,
+            listing_cache=args.listing_cache,
+            nomina_types=nomina_types(args),
+            dry_run=args.dry_run,
+            debug_artifacts=args.debug_artifacts,
+            log_level=LOG_DETAIL if args.verbose else LOG_INFO,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    except KeyboardInterrupt:
+        log("Proceso cancelado por el usuario")
+        return 130
+    
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+def main(argv=None):
+    """
+    Ejecuta una descarga desde la línea de comandos y devuelve el código de salida.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not 1 <= args.concurrency <= MAX_CONCURRENCY:
+        parser.error(f"--concurrency debe estar entre 1 y {MAX_CONCURRENCY}")
+    
+    username = os.environ.get(ENV_USERNAME)
+    password = os.environ.get(ENV_PASSWORD)
+    
+    if args.batch:
+        return run_batch_command(parser, args, username, password)
+    
+    if args.months:
+        if args.date_from or args.date_to:
+            parser.error("Use --months o --from/--to, no ambos")
+        args.date_from = index_to_year_month(args.months[0][0])
+        args.date_to = index_to_year_month(args.months[-1][1])
+    if not args.identificacion or not args.date_from or not args.date_to:
+        parser.error("Indique --id y --from/--to o --months, o un archivo de cuentas con --batch")
+    if not username or not password:
+        parser.error(f"Defina las variables de entorno {ENV_USERNAME} y {ENV_PASSWORD}")
+    
+    (year_from, month_from), (year_to, month_to) = args.date_from, args.date_to
+    if (year_from, month_from) > (year_to, month_to):
+        parser.error("--from debe ser anterior o igual a --to")
+    
+    identificaciones = [value.strip() for value in args.identificacion.split(",") if value.strip()]
+    if not identificaciones:
+        parser.error("--id no contiene ninguna identificación")
+    
+    # El motor (Selenium, requests) solo se carga si los argumentos son válidos
+    from cremil_downloader.engine import DownloadEngine
+    engine = DownloadEngine(
+        identificacion=identificaciones[0],
+        identificaciones=identificaciones,
+        reload_listing=args.reload_listing,
+        username=username,
+        password=password,
+        year_from=year_from,
+        year_to=year_to,
+        month_from=month_from,
+        month_to=month_to,
+        download_dir=os.path.abspath(args.download_dir),
+        headless=not args.visible,
+        download_mode=args.mode,
+        concurrency=args.concurrency,
+        incremental=args.incremental,
+        resume=args.resume,
+        session_cache=args.session_cache,
+        network_capture=args.network_capture,
+        listing_cache=args.listing_cache,
+        month_ranges=args.months,
+        nomina_types=nomina_types(args),
+        dry_run=args.dry_run,
+        debug_artifacts=args.debug_artifacts,
+        log_level=LOG_DETAIL if args.verbose else LOG_INFO,
+        on_status=log,
+        on_progress=lambda value, text: log(f"{value}% {text}"),
+    )
+    
+    try:
+        engine.run()
+    except KeyboardInterrupt:
+        engine.stop()
+        log("Proceso cancelado por el usuario")
+        return 130
+    except Exception as e:
+        log(f"Error durante la ejecución: {str(e)}\n{traceback.format_exc()}")
+        return 1
+    
+    if engine.stats["failed"]:
+        log(f"Proceso completado con {engine.stats['failed']} comprobantes sin descargar")
+        return 1
+    log("Proceso completado con éxito")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
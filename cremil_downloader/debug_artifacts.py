@@ -0,0 +1,102 @@
+"""
+Archivos de depuración: capturas de pantalla y HTML de las páginas del portal.
+
+Cada captura es una transferencia bloqueante del navegador (una imagen o todo el
+DOM, de varios MB), por eso se toman según un nivel configurable:
+
+    ninguno  no se guarda nada
+    fallos   solo cuando algo falla (inicio de sesión, tabla vacía, respuesta que
+             no es un PDF, error de la ejecución)
+    siempre  además, las capturas de cada ejecución tras iniciar sesión y de la tabla
+
+La transferencia desde el navegador se hace en el hilo que lo controla (Selenium
+no admite llamadas concurrentes), pero la escritura en disco se hace en un hilo
+aparte para no detener las descargas.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Niveles de archivos de depuración
+DEBUG_OFF = "ninguno"
+DEBUG_ON_FAILURE = "fallos"
+DEBUG_ALWAYS = "siempre"
+DEBUG_LEVELS = [DEBUG_OFF, DEBUG_ON_FAILURE, DEBUG_ALWAYS]
+DEFAULT_DEBUG_LEVEL = DEBUG_ON_FAILURE
+
+
+class DebugArtifacts:
+    """
+    Guarda en segundo plano las capturas y el HTML que pide el nivel configurado.
+    
+    Args:
+        directory: Directorio donde se guardan los archivos con nombre relativo
+        level: Uno de DEBUG_LEVELS
+        on_status: Callback para informar de cada archivo guardado (opcional)
+    """
+
+    def __init__(self, directory, level=DEFAULT_DEBUG_LEVEL, on_status=None):
+        if level not in DEBUG_LEVELS:
+            raise ValueError(f"Nivel de depuración desconocido: {level}")
+        self.directory = directory
+        self.level = level
+        self.on_status = on_status
+        self.executor = None
+
+    def wants(self, failure=False):
+        """
+        Indica si se deben guardar archivos de depuración para un evento normal o un fallo.
+        """
+        return self.level == DEBUG_ALWAYS or (failure and self.level == DEBUG_ON_FAILURE)
+
+    def capture(self, driver, screenshot=None, html_name=None, html=None, failure=False):
+        """
+        Toma una captura de pantalla y/o el HTML de la página si el nivel lo pide.
+        
+        Args:
+            driver: Instancia del navegador Selenium
+            screenshot: Nombre del archivo PNG de la captura (None para no tomarla)
+            html_name: Nombre del archivo HTML (None para no guardarlo)
+            html: HTML ya leído de la página, para no volver a pedirlo al navegador
+            failure: True si la captura documenta un fallo
+        """
+        if not self.wants(failure):
+            return
+        try:
+            if screenshot:
+                self.write(screenshot, driver.get_screenshot_as_png())
+            if html_name:
+                self.write(html_name, html if html is not None else driver.page_source)
+        except Exception as e:
+            self.status(f"No se pudo tomar la captura de depuración: {str(e)}")
+
+    def write(self, name, data):
+        """
+        Encola la escritura de un archivo (bytes o texto); name puede ser una ruta absoluta.
+        """
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cremil_depuracion")
+        self.executor.submit(self._write, os.path.join(self.directory, name), data)
+
+    def close(self):
+        """
+        Espera a que terminen las escrituras pendientes.
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def status(self, message):
+        if self.on_status is not None:
+            self.on_status(message)
+
+    def _write(self, path, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        try:
+            temp_path = f"{path}.part"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+            self.status(f"Archivo de depuración guardado en: {path}")
+        except OSError as e:
+            self.status(f"No se pudo guardar el archivo de depuración {path}: {str(e)}")
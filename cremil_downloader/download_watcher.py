@@ -0,0 +1,195 @@
+"""
+Vigilancia del directorio de descarga para los PDF que descarga Chrome al hacer clic.
+
+Con el paquete watchdog se usan los eventos del sistema de archivos (inotify en
+Linux, ReadDirectoryChangesW en Windows); sin él se recurre a un sondeo periódico
+del directorio. Un archivo se da por terminado cuando aparece con su nombre
+definitivo (Chrome renombra el .crdownload al final) y su tamaño deja de cambiar.
+Cada turno recibe el primer archivo terminado después de reservarlo; los archivos
+que terminan sin ningún turno pendiente se ignoran. Un nombre se olvida cuando el
+archivo se mueve o se borra, así que una descarga nueva con el mismo nombre se
+vuelve a detectar.
+
+El orden de los turnos no basta para saber qué archivo corresponde a cada clic
+(una descarga tardía o un archivo que escribe el propio motor pueden adelantarse),
+por eso el motor vigila un directorio propio por cada clic.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # Dependencia opcional
+    FileSystemEventHandler = object
+    Observer = None
+
+# Extensiones temporales de descargas en curso
+TEMP_EXTENSIONS = (".crdownload", ".part", ".tmp")
+
+# Intervalo entre dos lecturas de tamaño iguales para dar un archivo por terminado
+STABLE_INTERVAL = 0.3
+
+# Frecuencia del sondeo cuando no hay eventos del sistema de archivos
+POLL_INTERVAL = 0.5
+
+
+class DownloadTicket:
+    """
+    Turno de una descarga: se completa con la ruta del archivo que le corresponde.
+    """
+
+    def __init__(self):
+        self.path = None
+        self.ready = threading.Event()
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.file_appeared(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.watcher.file_gone(event.src_path)
+            self.watcher.file_appeared(event.dest_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.watcher.file_gone(event.src_path)
+
+
+class DownloadWatcher:
+    """
+    Detecta los archivos que terminan de descargarse en un directorio y los asigna por turnos.
+    """
+
+    def __init__(self, directory, extension=".pdf"):
+        self.directory = directory
+        self.extension = extension.lower()
+        self.lock = threading.Lock()
+        self.tickets = deque()
+        self.seen = set()
+        self.candidates = deque()
+        self.candidate_added = threading.Event()
+        self.running = False
+        self.observer = None
+        self.threads = []
+
+    @property
+    def uses_events(self):
+        return self.observer is not None
+
+    def start(self):
+        self.seen = {entry.name for entry in os.scandir(self.directory) if entry.is_file()}
+        self.running = True
+        if Observer is not None:
+            self.observer = Observer()
+            self.observer.schedule(_EventHandler(self), self.directory, recursive=False)
+            self.observer.start()
+        else:
+            self.threads.append(threading.Thread(target=self._poll, daemon=True))
+        self.threads.append(threading.Thread(target=self._check_candidates, daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.running = False
+        self.candidate_added.set()
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def expect(self):
+        """
+        Reserva un turno antes de hacer clic; el siguiente archivo terminado será para él.
+        """
+        ticket = DownloadTicket()
+        with self.lock:
+            self.tickets.append(ticket)
+        return ticket
+
+    def wait(self, ticket, timeout):
+        """
+        Espera el archivo del turno.
+        
+        Returns:
+            Ruta del archivo descargado o None si no terminó dentro del tiempo indicado
+        """
+        if not ticket.ready.wait(timeout):
+            with self.lock:
+                if ticket in self.tickets:
+                    self.tickets.remove(ticket)
+        return ticket.path
+
+    def file_appeared(self, path):
+        name = os.path.basename(path)
+        if not name.lower().endswith(self.extension) or name.lower().endswith(TEMP_EXTENSIONS):
+            return
+        with self.lock:
+            if name in self.seen:
+                return
+            self.seen.add(name)
+            self.candidates.append(path)
+        self.candidate_added.set()
+
+    def file_gone(self, path):
+        # Olvidar el nombre para detectar una descarga posterior con el mismo nombre
+        with self.lock:
+            self.seen.discard(os.path.basename(path))
+
+    def _poll(self):
+        # Sondeo de respaldo: compara los nombres del directorio con los ya vistos
+        while self.running:
+            try:
+                names = {entry.name: entry.path for entry in os.scandir(self.directory) if entry.is_file()}
+            except OSError:
+                names = {}
+            with self.lock:
+                self.seen &= names.keys()
+            for name, path in names.items():
+                if name not in self.seen:
+                    self.file_appeared(path)
+            time.sleep(POLL_INTERVAL)
+
+    def _check_candidates(self):
+        # Espera a que el tamaño de cada archivo nuevo se estabilice y lo asigna al turno más antiguo
+        while self.running:
+            self.candidate_added.wait(POLL_INTERVAL)
+            self.candidate_added.clear()
+            while self.running:
+                with self.lock:
+                    if not self.candidates:
+                        break
+                    path = self.candidates.popleft()
+                if not self._wait_until_stable(path):
+                    self.file_gone(path)
+                    continue
+                with self.lock:
+                    ticket = self.tickets.popleft() if self.tickets else None
+                if ticket is not None:
+                    ticket.path = path
+                    ticket.ready.set()
+
+    def _wait_until_stable(self, path):
+        last_size = -1
+        while self.running:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                # El archivo desapareció (renombrado o borrado)
+                return False
+            if size > 0 and size == last_size:
+                return True
+            last_size = size
+            time.sleep(STABLE_INTERVAL)
+        return False
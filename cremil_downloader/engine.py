@@ -0,0 +1,2062 @@
+"""
+Motor de descarga de comprobantes de pago de CREMIL.
+
+No depende de Qt: la interfaz gráfica y la línea de comandos reciben los
+mensajes del proceso mediante callbacks.
+"""
+import os
+import re
+import shutil
+import tempfile
+import time
+import traceback
+import threading
+import base64
+import hashlib
+import json
+import socket
+from datetime import datetime
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import SessionNotCreatedException, TimeoutException
+from urllib.parse import urlparse
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+from cremil_downloader.browser_pool import forget_driver_path, resolve_driver_path
+from cremil_downloader.debug_artifacts import DebugArtifacts, DEFAULT_DEBUG_LEVEL
+from cremil_downloader.download_watcher import DownloadWatcher
+from cremil_downloader.metrics import RunMetrics
+from cremil_downloader.options import (MONTHS_MAP, MODE_HTTP, DEFAULT_CONCURRENCY,
+                                       LOG_DETAIL, LOG_INFO, DEFAULT_LOG_LEVEL)
+from cremil_downloader.pipeline import DownloadPipeline
+from cremil_downloader.planner import DownloadPlanner, load_history, estimate_plan, format_plan
+from cremil_downloader.retry import RetryPolicy, AdaptiveRateLimiter
+from cremil_downloader.retry import (ERROR_TIMEOUT, ERROR_CONNECTION, ERROR_THROTTLED, ERROR_SERVER,
+                                     ERROR_NOT_PDF, ERROR_INVALID_PDF, ERROR_SESSION, ERROR_CLIENT,
+                                     ERROR_BROWSER, ERROR_UNKNOWN)
+from cremil_downloader.session_cache import SessionCache, DEFAULT_SESSION_TTL
+from cremil_downloader.session_cache import is_available as session_cache_available
+
+# Desactivar advertencias de SSL para requests
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# Páginas del portal (CREMIL_PORTAL_URL permite apuntar a un portal de pruebas local)
+PORTAL_URL = os.environ.get("CREMIL_PORTAL_URL", "https://www.cremil.gov.co/app").rstrip("/")
+LOGIN_URL = f"{PORTAL_URL}/utils/login_form"
+OVERVIEW_URL = f"{PORTAL_URL}/account/overview"
+LISTING_URL = f"{PORTAL_URL}/descargarcomprobantes"
+
+# Tiempos máximos de espera (en segundos) para cada etapa. No son pausas fijas:
+# cada etapa continúa en cuanto la página está lista y solo espera el máximo
+# cuando el portal no responde.
+DEFAULT_TIMEOUTS = {
+    "login_form": 15,   # formulario de inicio de sesión visible
+    "login": 30,        # redirección a account/overview tras el clic
+    "listing": 40,      # filas .boton-estilo en descargarcomprobantes
+    "pdf": 40,          # contenido PDF (o una página que no lo es) en la pestaña del comprobante
+    "download": 40,     # archivo descargado al hacer clic en el botón (Método 3)
+    "logout": 5,        # cierre de sesión procesado
+}
+
+# Frecuencia de sondeo de las condiciones de espera
+POLL_FREQUENCY = 0.25
+
+# Memoria que Chrome reserva para conservar los cuerpos de respuesta capturados por DevTools
+CDP_BUFFER_SIZE = 50 * 1024 * 1024
+
+# Manifiesto de comprobantes descargados (JSON lines dentro del directorio de descarga)
+MANIFEST_FILENAME = "manifiesto_comprobantes.jsonl"
+
+# Diario del trabajo en curso (JSON lines) con el estado de cada comprobante
+JOURNAL_FILENAME = "diario_descargas.jsonl"
+
+# Última tabla de comprobantes leída por identificación y su vigencia (en segundos)
+LISTING_CACHE_FILENAME = "tabla_comprobantes.json"
+
+# Subdirectorio del directorio de descarga donde cada clic de descarga tiene su propio directorio
+CLICK_DOWNLOADS_DIRNAME = ".descargas_clic"
+LISTING_CACHE_TTL = 6 * 3600
+
+# Resumen de la tabla de comprobantes cargada en el navegador (filas y último consecutivo),
+# con los mismos criterios que parse_comprobantes, sin transferir todo el HTML
+LISTING_SIGNATURE_SCRIPT = """
+var rows = 0, latest = 0;
+document.querySelectorAll('.boton-estilo').forEach(function (button) {
+    var url = button.getAttribute('data-url');
+    var row = button.closest('tr');
+    if (!url || !row || row.querySelectorAll('td').length < 3) return;
+    rows++;
+    var match = /numConsecutivo=(\\d+)/.exec(url);
+    if (match && parseInt(match[1], 10) > latest) latest = parseInt(match[1], 10);
+});
+return [rows, latest];
+"""
+
+# Estados de un comprobante en el diario
+STATE_PENDING = "pendiente"
+STATE_IN_PROGRESS = "en_curso"
+STATE_DONE = "completado"
+STATE_FAILED = "fallido"
+
+# Tiempo máximo de espera de una petición HTTP (conexión, lectura)
+HTTP_TIMEOUT = (10, 30)
+
+# Conexiones persistentes por host que mantiene la sesión HTTP
+HTTP_POOL_SIZE = 10
+
+# Tamaño de bloque para escribir los PDF sin cargarlos completos en memoria
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Bytes finales del PDF donde se buscan startxref y %%EOF
+PDF_TAIL_SIZE = 2048
+
+# Reinicios de sesión seguidos permitidos sin descargar ningún comprobante entre ellos
+MAX_RELOGINS = 3
+
+# Ritmo inicial y máximo de peticiones por segundo; se ajusta según las respuestas del portal
+HTTP_INITIAL_RATE = 16.0
+HTTP_MAX_RATE = 50.0
+BROWSER_MAX_RATE = 2.0
+
+
+def find_free_port():
+    """
+    Devuelve un puerto TCP libre en la interfaz local.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def build_http_session(cookies, user_agent, referer=LISTING_URL, pool_size=HTTP_POOL_SIZE):
+    """
+    Crea una sesión de requests a partir de cookies con el formato de Selenium.
+    
+    La sesión reutiliza conexiones (keep-alive), por lo que cada comprobante
+    cuesta una sola petición HTTP en lugar de renderizar una pestaña.
+    """
+    session = requests.Session()
+    session.verify = False
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+    session.headers["Referer"] = referer
+    for cookie in cookies:
+        session.cookies.set(cookie["name"], cookie["value"],
+                            domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+    return session
+
+
+def create_http_session(driver, pool_size=HTTP_POOL_SIZE):
+    """
+    Crea una sesión de requests con las cookies y el User-Agent del navegador autenticado.
+    """
+    return build_http_session(driver.get_cookies(), driver.execute_script("return navigator.userAgent;"),
+                              referer=driver.current_url, pool_size=pool_size)
+
+
+def session_is_valid(session):
+    """
+    Comprueba con una sola petición si la sesión sigue autenticada
+    (la página de la cuenta no redirige al formulario de inicio de sesión).
+    """
+    try:
+        response = session.get(OVERVIEW_URL, timeout=HTTP_TIMEOUT)
+    except requests.RequestException:
+        return False
+    return response.status_code == 200 and "login" not in response.url.lower()
+
+
+def is_pdf_response(response, head):
+    """
+    Indica si una respuesta HTTP contiene un PDF (por Content-Type o por la firma %PDF
+    al inicio del cuerpo, head).
+    """
+    content_type = response.headers.get("content-type", "").lower()
+    return "pdf" in content_type or head[:4] == b"%PDF"
+
+
+def file_sha256(filepath):
+    """
+    Calcula el SHA-256 de un archivo leyéndolo por bloques.
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def validate_pdf(filepath):
+    """
+    Comprueba que un archivo guardado sea un PDF completo.
+    
+    Verifica la cabecera %PDF-, la marca %%EOF final (un archivo truncado no la
+    tiene) y que la posición indicada por startxref apunte a una tabla xref o a
+    un objeto (xref en forma de stream).
+    
+    Returns:
+        None si el archivo es válido; si no, el motivo del rechazo
+    """
+    try:
+        size = os.path.getsize(filepath)
+        with open(filepath, 'rb') as f:
+            head = f.read(1024)
+            f.seek(max(0, size - PDF_TAIL_SIZE))
+            tail = f.read()
+            if b"%PDF-" not in head:
+                return "no tiene la cabecera %PDF-"
+            if b"%%EOF" not in tail:
+                return "no termina en %%EOF (archivo truncado)"
+            matches = re.findall(rb"startxref\s+(\d+)", tail)
+            if not matches:
+                return "no tiene startxref"
+            xref_offset = int(matches[-1])
+            if xref_offset >= size:
+                return "startxref apunta fuera del archivo"
+            f.seek(xref_offset)
+            xref = f.read(64).lstrip()
+            if not (xref.startswith(b"xref") or re.match(rb"\d+\s+\d+\s+obj", xref)):
+                return "startxref no apunta a una tabla xref"
+    except OSError as e:
+        return f"no se pudo leer ({str(e)})"
+    return None
+
+
+def receipt_filename(identificacion, comp):
+    """
+    Nombre de archivo de un comprobante, el mismo para todos los métodos de descarga.
+    """
+    return f"{identificacion}_{comp['year']}_{comp['month_name'].lower()}_{comp['nomina_type']}_{comp['consecutivo']}.pdf"
+
+
+def link_duplicate(existing_path, filepath):
+    """
+    Sustituye filepath por un enlace duro a existing_path (mismo contenido, un solo archivo en disco).
+    
+    Returns:
+        True si se creó el enlace; False si el sistema de archivos no lo permite (se conserva la copia)
+    """
+    temp_path = f"{filepath}.enlace"
+    try:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        os.link(existing_path, temp_path)
+        os.replace(temp_path, filepath)
+        return True
+    except OSError:
+        return False
+
+
+def write_file_atomic(filepath, data):
+    """
+    Escribe un archivo en un temporal y lo renombra al final, de modo que nunca
+    quede en la ruta definitiva un PDF a medio escribir.
+    """
+    temp_path = f"{filepath}.part"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, filepath)
+
+
+def save_response_stream(response, filepath, require_pdf=True, rejected_path=None):
+    """
+    Guarda por bloques el cuerpo de una respuesta pedida con stream=True.
+    
+    La memoria usada no depende del tamaño del archivo: los bloques se escriben en
+    un temporal que se renombra al final.
+    
+    Args:
+        response: Respuesta de requests abierta con stream=True
+        filepath: Ruta de destino
+        require_pdf: Si es True, no se guarda en filepath una respuesta que no es un PDF
+        rejected_path: Ruta donde guardar para análisis el cuerpo que no es un PDF (opcional)
+    
+    Returns:
+        True si se guardó el archivo, False si la respuesta no era un PDF
+    """
+    chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+    head = next(chunks, b"")
+    is_pdf = not require_pdf or is_pdf_response(response, head)
+    if not is_pdf:
+        if rejected_path is None:
+            return False
+        filepath = rejected_path
+    
+    temp_path = f"{filepath}.part"
+    with open(temp_path, 'wb') as f:
+        f.write(head)
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(temp_path, filepath)
+    return is_pdf
+
+
+def save_base64_stream(text, filepath, start=0, require_pdf=True):
+    """
+    Decodifica por bloques un texto base64 (desde la posición start) y lo guarda de forma atómica.
+    
+    Evita crear la copia recortada del texto y la copia decodificada completa.
+    
+    Returns:
+        True si se guardó el archivo, False si el contenido no era un PDF
+    """
+    # Los bloques deben ser múltiplos de 4 caracteres para decodificarse por separado
+    chunk_chars = STREAM_CHUNK_SIZE // 3 * 4
+    head = base64.b64decode(text[start:start + chunk_chars])
+    if require_pdf and head[:4] != b"%PDF":
+        return False
+    
+    temp_path = f"{filepath}.part"
+    with open(temp_path, 'wb') as f:
+        f.write(head)
+        for position in range(start + chunk_chars, len(text), chunk_chars):
+            f.write(base64.b64decode(text[position:position + chunk_chars]))
+    os.replace(temp_path, filepath)
+    return True
+
+
+class DownloadManifest:
+    """
+    Índice local de comprobantes descargados, guardado como JSON lines en el directorio de descarga.
+    
+    Cada línea registra identificación, consecutivo, ruta, tamaño, SHA-256 y fecha
+    de un comprobante; si un comprobante aparece varias veces prevalece la última línea.
+    Antes de descargar se consulta el índice para saltar los archivos que siguen
+    intactos en disco.
+    """
+    
+    def __init__(self, download_dir):
+        self.download_dir = download_dir
+        self.path = os.path.join(download_dir, MANIFEST_FILENAME)
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.load()
+    
+    @staticmethod
+    def key(identificacion, consecutivo):
+        return f"{identificacion}:{consecutivo}"
+    
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    self.entries[self.key(entry["identificacion"], entry["consecutivo"])] = entry
+                except (ValueError, KeyError):
+                    # Línea incompleta (por ejemplo, escritura interrumpida): se ignora
+                    continue
+    
+    def is_complete(self, identificacion, consecutivo):
+        """
+        Indica si el comprobante ya está en disco con el mismo tamaño y SHA-256 registrados.
+        
+        Los consecutivos generados a partir de la posición en la tabla
+        ("consecutivo_N") no identifican el comprobante y nunca se consideran completos.
+        """
+        if not str(consecutivo).isdigit():
+            return False
+        entry = self.entries.get(self.key(identificacion, consecutivo))
+        if entry is None:
+            return False
+        filepath = os.path.join(self.download_dir, entry["path"])
+        try:
+            if os.path.getsize(filepath) != entry["size"]:
+                return False
+            return file_sha256(filepath) == entry["sha256"]
+        except OSError:
+            return False
+    
+    def find_duplicate(self, sha256, filepath):
+        """
+        Busca otro archivo registrado con el mismo contenido (por ejemplo, guardado con
+        el nombre de una versión anterior).
+        
+        Returns:
+            Ruta del archivo existente con ese SHA-256, o None
+        """
+        with self.lock:
+            entries = list(self.entries.values())
+        for entry in entries:
+            if entry.get("sha256") != sha256:
+                continue
+            existing_path = os.path.join(self.download_dir, entry["path"])
+            try:
+                if os.path.samefile(existing_path, filepath):
+                    continue
+                if os.path.getsize(existing_path) == entry["size"]:
+                    return existing_path
+            except OSError:
+                # El archivo registrado ya no existe
+                continue
+        return None
+    
+    def record(self, identificacion, consecutivo, filepath, sha256=None):
+        """
+        Añade al manifiesto un comprobante descargado.
+        """
+        entry = {
+            "identificacion": identificacion,
+            "consecutivo": consecutivo,
+            "path": os.path.relpath(filepath, self.download_dir),
+            "size": os.path.getsize(filepath),
+            "sha256": sha256 or file_sha256(filepath),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        }
+        with self.lock:
+            self.entries[self.key(identificacion, consecutivo)] = entry
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+class JobJournal:
+    """
+    Diario de solo anexado con el estado de cada comprobante de un trabajo de descarga.
+    
+    Cada trabajo se identifica por la identificación y el rango de fechas. Al iniciar
+    un trabajo nuevo se escribe una marca de inicio; al reanudarlo se leen los estados
+    posteriores a la última marca y solo se procesan los comprobantes sin completar.
+    """
+    
+    def __init__(self, download_dir, job_id):
+        self.path = os.path.join(download_dir, JOURNAL_FILENAME)
+        self.job_id = job_id
+        self.states = {}
+        self.lock = threading.Lock()
+        self.load()
+    
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Línea incompleta (por ejemplo, escritura interrumpida): se ignora
+                    continue
+                if entry.get("job") != self.job_id:
+                    continue
+                if entry.get("event") == "inicio":
+                    self.states = {}
+                elif "consecutivo" in entry:
+                    self.states[entry["consecutivo"]] = entry
+    
+    def append(self, entry):
+        entry = dict(entry, job=self.job_id, timestamp=datetime.now().isoformat(timespec="seconds"))
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            if "consecutivo" in entry:
+                self.states[entry["consecutivo"]] = entry
+    
+    def start(self, comprobantes, resume=False):
+        """
+        Registra el inicio (o la reanudación) del trabajo y devuelve los comprobantes por procesar.
+        
+        Args:
+            comprobantes: Lista de comprobantes filtrados
+            resume: Si es True, se omiten los comprobantes completados en la ejecución anterior
+        
+        Returns:
+            Lista de comprobantes pendientes
+        """
+        if not resume:
+            self.states = {}
+            self.append({"event": "inicio", "total": len(comprobantes)})
+        
+        pending = [comp for comp in comprobantes if not self.is_done(comp["consecutivo"])]
+        for comp in pending:
+            if comp["consecutivo"] not in self.states:
+                self.mark(comp, STATE_PENDING)
+        return pending
+    
+    def is_done(self, consecutivo):
+        entry = self.states.get(consecutivo)
+        return (entry is not None and entry["state"] == STATE_DONE
+                and os.path.exists(entry.get("path") or ""))
+    
+    def mark(self, comp, state, reason=None, path=None):
+        entry = {"consecutivo": comp["consecutivo"], "state": state}
+        if reason:
+            entry["reason"] = reason
+        if path:
+            entry["path"] = path
+        self.append(entry)
+
+
+def listing_signature(comprobantes):
+    """
+    Devuelve (número de filas, último consecutivo) de una tabla de comprobantes.
+    """
+    consecutivos = [int(comp["consecutivo"]) for comp in comprobantes if str(comp["consecutivo"]).isdigit()]
+    return len(comprobantes), max(consecutivos, default=0)
+
+
+class ListingCache:
+    """
+    Última tabla de comprobantes leída para cada identificación, guardada como JSON
+    en el directorio de descarga.
+    
+    Junto a los comprobantes se guardan el número de filas y el último consecutivo
+    (para comprobar con una consulta mínima si la tabla cambió) y las cabeceras
+    ETag / Last-Modified que devolvió el portal (para pedirla de forma condicional).
+    """
+    
+    def __init__(self, download_dir, ttl=LISTING_CACHE_TTL):
+        self.path = os.path.join(download_dir, LISTING_CACHE_FILENAME)
+        self.ttl = ttl
+        self.entries = {}
+        self.load()
+    
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(entries, dict):
+            self.entries = entries
+    
+    def get(self, identificacion):
+        return self.entries.get(str(identificacion))
+    
+    def is_fresh(self, entry):
+        """
+        Indica si la tabla guardada se leyó hace menos de ttl segundos.
+        """
+        return entry is not None and time.time() - entry.get("saved", 0) < self.ttl
+    
+    @staticmethod
+    def matches(entry, rows, latest):
+        """
+        Indica si la tabla guardada tiene las mismas filas y el mismo último consecutivo.
+        """
+        return entry is not None and entry.get("rows") == rows and entry.get("latest") == int(latest)
+    
+    @staticmethod
+    def conditional_headers(entry):
+        """
+        Cabeceras para pedir la tabla solo si cambió desde la lectura guardada.
+        """
+        headers = {}
+        if entry is not None and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry is not None and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+    
+    def store(self, identificacion, comprobantes, etag=None, last_modified=None):
+        """
+        Guarda la tabla leída y devuelve los consecutivos que no estaban en la lectura anterior.
+        """
+        previous = self.get(identificacion)
+        known = {comp["consecutivo"] for comp in previous["comprobantes"]} if previous else set()
+        rows, latest = listing_signature(comprobantes)
+        self.entries[str(identificacion)] = {
+            "saved": time.time(),
+            "rows": rows,
+            "latest": latest,
+            "etag": etag,
+            "last_modified": last_modified,
+            "comprobantes": [dict(comp) for comp in comprobantes],
+        }
+        self.save()
+        return [comp["consecutivo"] for comp in comprobantes if comp["consecutivo"] not in known]
+    
+    @staticmethod
+    def comprobantes(entry):
+        """
+        Copia de los comprobantes guardados (el proceso de descarga les añade la ruta de destino).
+        """
+        return [dict(comp) for comp in entry["comprobantes"]]
+    
+    def touch(self, identificacion):
+        """
+        Renueva la vigencia de la tabla guardada (el portal confirmó que no cambió).
+        """
+        entry = self.get(identificacion)
+        if entry is not None:
+            entry["saved"] = time.time()
+            self.save()
+    
+    def save(self):
+        try:
+            write_file_atomic(self.path, json.dumps(self.entries, ensure_ascii=False).encode("utf-8"))
+        except OSError:
+            # Sin la copia guardada solo se pierde el ahorro en la próxima ejecución
+            pass
+
+
+def parse_comprobantes(html, identificacion=None):
+    """
+    Extrae los comprobantes de la tabla de descargarcomprobantes a partir del HTML de la página.
+    
+    Analiza el HTML en una sola pasada, sin consultas adicionales al navegador.
+    Si se indica una identificación, se sustituye el parámetro numIdentificacion
+    de cada URL.
+    
+    Args:
+        html: Código HTML de la página (driver.page_source)
+        identificacion: Número de identificación para el que se piden los comprobantes
+    
+    Returns:
+        Lista de diccionarios con url, original_url, year, month_num, month_name,
+        nomina_type, consecutivo e index (posición del botón en la página)
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    comprobantes = []
+    for index, button in enumerate(soup.select(".boton-estilo")):
+        original_url = button.get("data-url")
+        if not original_url:
+            continue
+        
+        row = button.find_parent("tr")
+        cells = row.find_all("td") if row else []
+        if len(cells) < 3:
+            continue
+        
+        year_text = cells[0].get_text(strip=True)
+        month_name = cells[1].get_text(strip=True)
+        nomina_type = cells[2].get_text(strip=True)
+        
+        url = original_url
+        if identificacion:
+            url = re.sub(r'numIdentificacion=[^&]*', f'numIdentificacion={identificacion}', url)
+        
+        # Extraer el consecutivo de la URL
+        match = re.search(r'numConsecutivo=(\d+)', url)
+        
+        comprobantes.append({
+            "url": url,
+            "original_url": original_url,
+            "year": int(year_text) if year_text.isdigit() else 0,
+            "month_num": MONTHS_MAP.get(month_name, 0),
+            "month_name": month_name,
+            "nomina_type": nomina_type,
+            "consecutivo": match.group(1) if match else f"consecutivo_{index + 1}",
+            "index": index,
+        })
+    return comprobantes
+
+
+def portal_origin():
+    """
+    Origen (esquema://host) del portal, para borrar su almacenamiento del navegador.
+    """
+    parsed = urlparse(PORTAL_URL)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+# Condición de pdf_content_ready: la pestaña muestra un PDF o, con el documento ya
+# cargado, es claramente otra cosa (pestaña en blanco porque el PDF se descargó como
+# adjunto, página de inicio de sesión o de error con texto y sin visor)
+PDF_PAGE_SETTLED_SCRIPT = """
+if (document.readyState !== 'complete') return false;
+if (document.contentType === 'application/pdf') return true;
+var embed = document.querySelector('embed');
+if (embed && embed.src) return true;
+if (document.querySelector('embed, object, iframe')) return false;
+if (location.href === 'about:blank') return true;
+return !!(document.querySelector('input[type=password]')
+          || (document.body && document.body.innerText.trim()));
+"""
+
+
+def pdf_content_ready(driver):
+    """
+    Condición de espera: el documento terminó de cargar y expone contenido PDF
+    (visor con <embed> o documento servido como application/pdf), o terminó de
+    cargar y claramente no es un visor de PDF, para pasar enseguida a los demás
+    métodos en lugar de agotar el tiempo máximo.
+    """
+    return driver.execute_script(PDF_PAGE_SETTLED_SCRIPT)
+
+
+class DownloadEngine:
+    """
+    Inicia sesión en CREMIL y descarga los comprobantes de una o varias identificaciones.
+    
+    Los mensajes de estado se entregan a on_status(mensaje) y el avance a
+    on_progress(porcentaje, texto); ambos callbacks pueden llamarse desde
+    hilos del grupo de descargas. Los mensajes de cada paso intermedio solo se
+    entregan con log_level=LOG_DETAIL.
+    """
+    
+    def __init__(self, identificacion, username, password, year_from, year_to, 
+                 month_from, month_to, download_dir, headless=True, timeouts=None,
+                 download_delay=2, download_mode=MODE_HTTP, concurrency=DEFAULT_CONCURRENCY,
+                 max_per_host=None, incremental=True, resume=False,
+                 debug_port=None, profile_dir=None, identificaciones=None, reload_listing=False,
+                 session_cache=True, session_ttl=DEFAULT_SESSION_TTL, network_capture=False,
+                 listing_cache=True, listing_ttl=LISTING_CACHE_TTL, month_ranges=None, nomina_types=None,
+                 dry_run=False,
+                 browser_pool=None, debug_artifacts=DEFAULT_DEBUG_LEVEL, log_level=DEFAULT_LOG_LEVEL,
+                 on_status=None, on_progress=None):
+        # Varias identificaciones comparten un único inicio de sesión
+        self.identificaciones = list(identificaciones) if identificaciones else [identificacion]
+        self.identificacion = self.identificaciones[0]
+        self.reload_listing = reload_listing
+        self.username = username
+        self.password = password
+        self.year_from = year_from
+        self.year_to = year_to
+        self.month_from = month_from
+        self.month_to = month_to
+        # Selección de comprobantes: rangos de meses (por defecto, el rango desde-hasta) y tipos de nómina
+        if month_ranges:
+            self.planner = DownloadPlanner(month_ranges, nomina_types)
+        else:
+            self.planner = DownloadPlanner.from_span(year_from, month_from, year_to, month_to, nomina_types)
+        # En una simulación solo se calcula el plan de descarga
+        self.dry_run = dry_run
+        self.download_dir = download_dir
+        self.headless = headless
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.download_delay = download_delay
+        self.download_mode = download_mode
+        self.concurrency = max(1, concurrency)
+        # Todos los comprobantes están en el mismo host: por defecto el límite por host es
+        # la concurrencia configurada (un límite menor dejaría hilos esperando el semáforo)
+        self.max_per_host = max(1, max_per_host if max_per_host is not None else self.concurrency)
+        self.host_slots = {}
+        self.host_slots_lock = threading.Lock()
+        # Reintentos por tipo de fallo y ritmo adaptativo (download_delay es la pausa
+        # inicial entre comprobantes del navegador; luego se ajusta sola)
+        self.retry_policy = RetryPolicy()
+        self.http_limiter = AdaptiveRateLimiter(HTTP_INITIAL_RATE, max_rate=HTTP_MAX_RATE)
+        self.browser_limiter = AdaptiveRateLimiter(1.0 / download_delay if download_delay else BROWSER_MAX_RATE,
+                                                   max_rate=BROWSER_MAX_RATE)
+        self.incremental = incremental
+        self.manifest = None
+        self.resume = resume
+        self.journal = None
+        self.use_listing_cache = listing_cache
+        self.listing_ttl = listing_ttl
+        self.listing_cache = None
+        self.debug_port = debug_port
+        self.profile_dir = profile_dir
+        self.network_capture = network_capture
+        # Grupo de navegadores iniciados compartido entre trabajos (opcional)
+        self.browser_pool = browser_pool
+        self.warned_no_watchdog = False
+        self.use_session_cache = session_cache
+        self.session_cache = SessionCache(ttl=session_ttl) if session_cache and session_cache_available() else None
+        self.on_status = on_status
+        self.on_progress = on_progress
+        self.log_level = log_level
+        # Capturas de pantalla y HTML de depuración (ninguno / fallos / siempre)
+        self.debug = DebugArtifacts(download_dir, debug_artifacts, on_status=self.status)
+        # Contadores del último proceso (para resúmenes de lotes)
+        self.stats = {"found": 0, "selected": 0, "skipped": 0, "downloaded": 0, "failed": 0,
+                      "retries": 0, "relogins": 0}
+        self.stats_lock = threading.Lock()
+        # Renovación de la sesión caducada: cada renovación incrementa la generación para que
+        # los hilos que fallaron a la vez con la sesión anterior solo provoquen un reinicio
+        self.session_lock = threading.Lock()
+        self.session_generation = 0
+        self.session_lost = False
+        self.relogins_since_download = 0
+        # Tiempos por etapa, métodos de descarga y bytes para el informe de la ejecución
+        self.metrics = RunMetrics()
+        self.is_running = True
+    
+    def stop(self):
+        self.is_running = False
+    
+    def count(self, key, amount=1):
+        with self.stats_lock:
+            self.stats[key] += amount
+    
+    def pause(self, seconds):
+        """
+        Espera los segundos indicados, o menos si se detiene el proceso.
+        """
+        deadline = time.monotonic() + seconds
+        while self.is_running and time.monotonic() < deadline:
+            time.sleep(min(POLL_FREQUENCY, deadline - time.monotonic()))
+    
+    def status(self, message, level=LOG_INFO):
+        if self.on_status is not None and level >= self.log_level:
+            self.on_status(message)
+    
+    def detail(self, message):
+        """
+        Envía un mensaje de un paso intermedio (solo con log_level=LOG_DETAIL).
+        """
+        self.status(message, LOG_DETAIL)
+    
+    def progress(self, value, text):
+        if self.on_progress is not None:
+            self.on_progress(value, text)
+    
+    def wait_until(self, driver, condition, stage):
+        """
+        Espera a que se cumpla una condición con el tiempo máximo configurado para la etapa.
+        
+        Args:
+            driver: Instancia del navegador Selenium
+            condition: Condición de espera (expected_conditions o función que recibe el driver)
+            stage: Clave de self.timeouts con el tiempo máximo de espera
+        
+        Returns:
+            El valor devuelto por la condición, o None si se agotó el tiempo de espera
+        """
+        timeout = self.timeouts[stage]
+        start_time = time.time()
+        try:
+            result = WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(condition)
+        except TimeoutException:
+            self.metrics.add_span(f"espera_{stage}", time.time() - start_time, ok=False)
+            self.status(f"Advertencia: se agotó el tiempo de espera ({timeout} s) en la etapa '{stage}'")
+            return None
+        self.metrics.add_span(f"espera_{stage}", time.time() - start_time)
+        self.detail(f"Etapa '{stage}' lista en {time.time() - start_time:.1f} s")
+        return result
+    
+    def run(self):
+        """
+        Ejecuta el proceso completo; las excepciones se propagan a quien lo invoca.
+        
+        Al terminar (también si hubo un error) escribe el informe de rendimiento en
+        el directorio de descarga y envía una línea de resumen.
+        """
+        try:
+            self.login_and_download_comprobantes()
+        finally:
+            self.debug.close()
+            self.write_report()
+    
+    def write_report(self):
+        """
+        Escribe el informe de tiempos de la ejecución y envía la línea de resumen.
+        """
+        if not os.path.isdir(self.download_dir):
+            return
+        try:
+            report_path = self.metrics.write_report(
+                self.download_dir, self.stats, identificaciones=self.identificaciones,
+                mode=self.download_mode, concurrency=self.concurrency,
+                desde=f"{self.year_from}-{self.month_from}", hasta=f"{self.year_to}-{self.month_to}")
+            self.status(f"Informe de rendimiento guardado en: {report_path}")
+        except OSError as e:
+            self.status(f"No se pudo guardar el informe de rendimiento: {str(e)}")
+        self.status(self.metrics.summary_line(self.stats))
+    
+    def login_and_download_comprobantes(self):
+        """
+        Script para automatizar el inicio de sesión en CREMIL y la descarga de comprobantes de pago.
+        """
+        # Crear directorio de descarga si no existe
+        if not os.path.exists(self.download_dir):
+            os.makedirs(self.download_dir)
+            self.status(f"Directorio de descarga creado: {self.download_dir}")
+        
+        # Cargar el manifiesto de descargas previas para descargar solo lo nuevo
+        if self.incremental:
+            self.manifest = DownloadManifest(self.download_dir)
+        
+        # Última tabla de comprobantes leída, para no volver a analizarla si no cambió
+        if self.use_listing_cache:
+            self.listing_cache = ListingCache(self.download_dir, ttl=self.listing_ttl)
+        
+        # Con una sesión guardada y vigente no hace falta abrir el navegador
+        if self.use_session_cache and self.session_cache is None:
+            self.status("Advertencia: el paquete 'cryptography' no está instalado; no se guardará la sesión")
+        if self.download_with_cached_session():
+            return
+        if self.plan_from_listing_cache():
+            return
+        if not self.is_running:
+            self.status("Proceso cancelado por el usuario")
+            return
+        # Los contadores del intento sin navegador se recalculan en la ejecución completa
+        # (lo ya descargado por HTTP queda registrado en el manifiesto)
+        with self.stats_lock:
+            self.stats.update(found=0, selected=0, skipped=0, failed=0)
+        
+        driver = self.start_browser()
+        
+        try:
+            # Sin sesión no hay tabla que leer: la ejecución falla en lugar de terminar sin comprobantes
+            if not self.login(driver):
+                raise RuntimeError("No se pudo iniciar sesión en el portal (revise usuario y contraseña)")
+            self.session_lost = False
+            
+            # Captura de pantalla después del inicio de sesión (solo con el nivel "siempre")
+            self.debug.capture(driver, screenshot="cremil_logged_in.png")
+            
+            # Navegar directamente a la página de comprobantes
+            if not self.load_listing(driver):
+                raise RuntimeError("No se encontró la tabla de comprobantes en el portal")
+            
+            # Guardar la sesión cifrada para las próximas ejecuciones (ya confirmada)
+            self.save_session(driver)
+            
+            # Captura y HTML de la página de comprobantes; el HTML leído se reutiliza
+            # para la tabla de la primera identificación
+            html = None
+            if self.debug.wants():
+                html = driver.page_source
+                self.debug.capture(driver, screenshot="cremil_comprobantes.png",
+                                   html_name="pagina_comprobantes.html", html=html)
+            
+            # Descargar los comprobantes de cada identificación con la misma sesión
+            for position, identificacion in enumerate(self.identificaciones):
+                if not self.is_running:
+                    self.status("Proceso cancelado por el usuario")
+                    break
+                if position > 0 and self.reload_listing and not self.load_listing(driver):
+                    raise RuntimeError("No se encontró la tabla de comprobantes en el portal")
+                self.select_identificacion(driver, identificacion)
+                self.descargar_comprobantes(driver, html=html if position == 0 else None)
+        
+        except Exception as e:
+            self.status(f"Error durante la ejecución: {str(e)}")
+            self.debug.capture(driver, screenshot="fallo_ejecucion.png", html_name="fallo_ejecucion.html",
+                               failure=True)
+            raise
+        
+        finally:
+            # Con la sesión guardada no se cierra sesión, para reutilizarla en la próxima ejecución
+            if self.session_cache is not None:
+                self.status("Se conserva la sesión abierta para reutilizarla")
+            else:
+                self.logout(driver)
+            
+            # Ahora cerramos el navegador (o lo devolvemos al grupo para el siguiente trabajo)
+            if self.browser_pool is not None:
+                self.browser_pool.release(self.browser_key(), driver, origins=[portal_origin()])
+                self.status("Navegador devuelto al grupo para el siguiente trabajo")
+            else:
+                driver.quit()
+                self.status("Navegador cerrado")
+
+    def chrome_options(self):
+        """
+        Devuelve las opciones de Chrome para esta ejecución.
+        """
+        # Configurar opciones de Chrome
+        chrome_options = Options()
+        if os.environ.get("CHROME_BINARY"):
+            chrome_options.binary_location = os.environ["CHROME_BINARY"]
+        if self.headless:
+            chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--window-size=1920,1080")
+        # Puerto de depuración y perfil propios para que varias instancias no choquen
+        chrome_options.add_argument(f"--remote-debugging-port={self.debug_port or find_free_port()}")
+        if self.profile_dir:
+            chrome_options.add_argument(f"--user-data-dir={self.profile_dir}")
+        chrome_options.add_argument("--disable-extensions")
+        # Permitir descargas en modo headless
+        prefs = {
+            "download.default_directory": self.download_dir,
+            "download.prompt_for_download": False,
+            "download.directory_upgrade": True,
+            # Con la captura de red el PDF se abre en el visor para conservar la respuesta
+            "plugins.always_open_pdf_externally": not self.network_capture,
+            "profile.default_content_settings.popups": 0
+        }
+        chrome_options.add_experimental_option("prefs", prefs)
+        if self.network_capture:
+            # Registro de rendimiento con los eventos Network.* de DevTools
+            chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        return chrome_options
+    
+    def browser_key(self):
+        """
+        Opciones del navegador que no se pueden cambiar después de iniciarlo (clave del grupo).
+        """
+        return (self.headless, self.network_capture, self.profile_dir, os.environ.get("CHROME_BINARY"))
+    
+    def create_browser(self):
+        """
+        Inicia un navegador nuevo con chromedriver resuelto desde la caché local.
+        
+        Si Chrome rechaza el driver guardado (se actualizó a otra versión), se descarta
+        la ruta guardada, se resuelve de nuevo y se reintenta una vez.
+        """
+        with self.metrics.span("chromedriver"):
+            driver_path = resolve_driver_path(on_status=self.status)
+        try:
+            with self.metrics.span("inicio_navegador"):
+                return webdriver.Chrome(service=Service(driver_path), options=self.chrome_options())
+        except SessionNotCreatedException as e:
+            if os.environ.get("CHROMEDRIVER_PATH"):
+                raise
+            self.status(f"Chrome no aceptó el chromedriver guardado ({str(e).splitlines()[0]}); se resuelve de nuevo")
+            forget_driver_path()
+        with self.metrics.span("chromedriver"):
+            driver_path = resolve_driver_path(on_status=self.status)
+        with self.metrics.span("inicio_navegador"):
+            return webdriver.Chrome(service=Service(driver_path), options=self.chrome_options())
+    
+    def start_browser(self):
+        """
+        Obtiene el navegador de la ejecución: del grupo de navegadores si hay uno, o uno nuevo.
+        """
+        self.status("Iniciando navegador...")
+        try:
+            if self.browser_pool is None:
+                return self.create_browser()
+            (driver, reused) = self.browser_pool.acquire(self.browser_key(), self.create_browser)
+            if reused:
+                self.status("Reutilizando un navegador ya iniciado")
+            # El directorio de descarga de un navegador reutilizado es el de su primer trabajo
+            driver.execute_cdp_cmd("Browser.setDownloadBehavior",
+                                   {"behavior": "allow", "downloadPath": os.path.abspath(self.download_dir)})
+            return driver
+        except Exception as e:
+            self.status(f"Error al inicializar el driver: {str(e)}")
+            raise
+    
+    def login(self, driver):
+        """
+        Inicia sesión en el portal con el formulario de inicio de sesión.
+        
+        Returns:
+            True si se detectó la página de la cuenta después del inicio de sesión
+        """
+        with self.metrics.span("inicio_sesion"):
+            # Abrir la página de inicio de sesión
+            self.detail("Navegando a la página de inicio de sesión...")
+            driver.get(LOGIN_URL)
+            self.detail("Página de inicio de sesión cargada correctamente")
+            
+            # Esperar a que el formulario de inicio de sesión sea visible
+            self.detail("Esperando a que el formulario de inicio de sesión sea visible...")
+            username_field = WebDriverWait(driver, self.timeouts["login_form"], poll_frequency=POLL_FREQUENCY).until(
+                EC.presence_of_element_located((By.ID, "rn_LoginFormCremilv2_9_Username"))
+            )
+            
+            # Ingresar credenciales
+            self.detail(f"Ingresando nombre de usuario: {self.username}")
+            username_field.send_keys(self.username)
+            
+            self.detail(f"Ingresando contraseña: {'*' * len(self.password)}")
+            password_field = driver.find_element(By.ID, "rn_LoginFormCremilv2_9_Password")
+            password_field.send_keys(self.password)
+            self.detail("Credenciales ingresadas correctamente")
+            
+            # Hacer clic en el botón de inicio de sesión
+            self.detail("Haciendo clic en el botón de inicio de sesión...")
+            login_button = driver.find_element(By.ID, "rn_LoginFormCremilv2_9_Submit")
+            login_button.click()
+            self.detail("Botón de inicio de sesión presionado")
+            
+            # Esperar a que se complete el inicio de sesión
+            self.detail("Esperando a que se complete el inicio de sesión...")
+            
+            # Verificar si el inicio de sesión fue exitoso
+            if self.wait_until(driver, EC.url_contains("account/overview"), "login"):
+                self.status("Inicio de sesión exitoso")
+                return True
+            else:
+                self.status("Advertencia: No se ha detectado la URL de inicio de sesión exitoso")
+                self.debug.capture(driver, screenshot="fallo_inicio_sesion.png",
+                                   html_name="fallo_inicio_sesion.html", failure=True)
+                return False
+    
+    def save_session(self, driver):
+        """
+        Guarda cifradas las cookies del navegador para las próximas ejecuciones (si la caché está activa).
+        """
+        if self.session_cache is not None:
+            try:
+                self.session_cache.save(self.username, self.password, driver.get_cookies(),
+                                        driver.execute_script("return navigator.userAgent;"))
+            except OSError as e:
+                # Sin la sesión guardada la próxima ejecución solo tendrá que iniciar sesión
+                self.status(f"No se pudo guardar la sesión: {str(e)}")
+                return
+            self.status("Sesión guardada para las próximas ejecuciones")
+    
+    def renew_session(self, generation, driver, http_session=None):
+        """
+        Vuelve a iniciar sesión cuando el portal la cerró a mitad de la ejecución.
+        
+        Si varios hilos detectan a la vez la misma sesión caducada, solo el primero
+        inicia sesión; los demás encuentran la generación ya renovada y reintentan.
+        
+        Args:
+            generation: Valor de self.session_generation antes de la petición que falló
+            driver: Navegador con el que iniciar sesión, o None si se trabaja sin navegador
+            http_session: Sesión de requests a la que copiar las cookies nuevas
+        
+        Returns:
+            True si hay una sesión nueva con la que reintentar, False si no se pudo renovar
+        """
+        with self.session_lock:
+            if generation != self.session_generation:
+                return True
+            if self.session_lost:
+                return False
+            if driver is None or self.relogins_since_download >= MAX_RELOGINS:
+                # Sin navegador (sesión guardada) se continúa con el proceso completo
+                self.status("La sesión del portal caducó y no se puede renovar en esta etapa")
+                self.session_lost = True
+                if self.session_cache is not None:
+                    self.session_cache.clear(self.username)
+                return False
+            
+            self.status("La sesión del portal caducó; iniciando sesión de nuevo...")
+            self.count("relogins")
+            self.relogins_since_download += 1
+            try:
+                with self.metrics.span("reinicio_sesion"):
+                    logged_in = self.login(driver) and self.load_listing(driver)
+                    self.apply_identificacion(driver, self.identificacion)
+            except Exception as e:
+                self.status(f"✗ No se pudo volver a iniciar sesión: {str(e)}")
+                logged_in = False
+            if not logged_in:
+                self.session_lost = True
+                return False
+            
+            if http_session is not None:
+                for cookie in driver.get_cookies():
+                    http_session.cookies.set(cookie["name"], cookie["value"],
+                                             domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+            self.save_session(driver)
+            self.session_generation += 1
+            self.status("✓ Sesión renovada; se reintentan los comprobantes afectados")
+            return True
+    
+    def browser_session_valid(self, driver):
+        """
+        Comprueba con una petición si las cookies del navegador siguen autenticadas.
+        """
+        session = create_http_session(driver, pool_size=1)
+        try:
+            return session_is_valid(session)
+        finally:
+            session.close()
+    
+    def download_with_cached_session(self):
+        """
+        Intenta completar la descarga solo por HTTP con la sesión guardada, sin abrir el navegador.
+        
+        Returns:
+            True si se descargó todo o se canceló el proceso; False si no hay sesión vigente, la tabla no se
+            puede leer por HTTP o quedaron comprobantes pendientes (en ese caso se
+            continúa con el navegador y el manifiesto evita repetir lo ya descargado)
+        """
+        if self.session_cache is None or self.download_mode != MODE_HTTP:
+            return False
+        
+        cached = self.session_cache.load(self.username, self.password)
+        if cached is None:
+            return False
+        
+        self.status("Validando la sesión guardada...")
+        session = build_http_session(cached["cookies"], cached.get("user_agent"),
+                                     pool_size=max(HTTP_POOL_SIZE, self.concurrency))
+        try:
+            with self.metrics.span("validar_sesion_guardada"):
+                valid = session_is_valid(session)
+            if not valid:
+                self.status("La sesión guardada ya no es válida; se iniciará sesión con el navegador")
+                self.session_cache.clear(self.username)
+                return False
+            
+            self.status("Sesión guardada válida: se omite el inicio de sesión con el navegador")
+            complete = True
+            for identificacion in self.identificaciones:
+                if not self.is_running:
+                    self.status("Proceso cancelado por el usuario")
+                    return True
+                
+                self.open_job(identificacion)
+                comprobantes = self.fetch_listing_http(session)
+                if not comprobantes:
+                    self.status("La tabla de comprobantes no está disponible por HTTP; se usará el navegador")
+                    return False
+                
+                remaining = self.descargar_comprobantes(None, http_session=session, comprobantes=comprobantes)
+                if not self.is_running:
+                    # Lo pendiente quedó así por la cancelación; no hay que seguir con el navegador
+                    self.status("Proceso cancelado por el usuario")
+                    return True
+                complete = complete and not remaining
+            return complete
+        except requests.RequestException as e:
+            self.status(f"Error al usar la sesión guardada: {str(e)}")
+            return False
+        finally:
+            session.close()
+    
+    def fetch_listing_http(self, session):
+        """
+        Obtiene la tabla de comprobantes de la identificación en curso con la sesión HTTP.
+        
+        Si la tabla guardada sigue vigente no se pide al portal; si caducó se pide de
+        forma condicional (ETag / Last-Modified) y un 304 renueva la copia guardada.
+        
+        Returns:
+            Lista de comprobantes (vacía si el portal no devolvió la tabla)
+        """
+        cached = self.listing_cache.get(self.identificacion) if self.listing_cache is not None else None
+        if self.listing_cache is not None and self.listing_cache.is_fresh(cached):
+            minutes = (time.time() - cached["saved"]) / 60
+            self.status(f"Se usa la tabla de comprobantes guardada hace {minutes:.0f} min")
+            return self.listing_cache.comprobantes(cached)
+        
+        with self.metrics.span("tabla_comprobantes", detail="http"):
+            response = session.get(LISTING_URL, headers=ListingCache.conditional_headers(cached), timeout=HTTP_TIMEOUT)
+        if response.status_code == 304 and cached is not None:
+            self.status("El portal confirma que la tabla de comprobantes no cambió; se usa la copia guardada")
+            self.listing_cache.touch(self.identificacion)
+            return self.listing_cache.comprobantes(cached)
+        if response.status_code != 200:
+            return []
+        return self.read_listing(None, html=response.text, etag=response.headers.get("ETag"),
+                                 last_modified=response.headers.get("Last-Modified"))
+    
+    def read_listing(self, driver, html=None, etag=None, last_modified=None):
+        """
+        Extrae los comprobantes de la identificación en curso y actualiza la tabla guardada.
+        
+        Con el navegador, si hay una tabla guardada vigente, primero se compara el número
+        de filas y el último consecutivo de la página; si coinciden se usa la copia
+        guardada sin transferir ni analizar todo el HTML.
+        
+        Args:
+            driver: Instancia del navegador Selenium (None si se indica html)
+            html: HTML de la página de comprobantes (por defecto, driver.page_source)
+            etag, last_modified: Cabeceras de la respuesta HTTP que devolvió html
+        """
+        cached = self.listing_cache.get(self.identificacion) if self.listing_cache is not None else None
+        if html is None and self.listing_cache is not None and self.listing_cache.is_fresh(cached):
+            try:
+                rows, latest = driver.execute_script(LISTING_SIGNATURE_SCRIPT)
+            except Exception:
+                rows = latest = None
+            if self.listing_cache.matches(cached, rows, latest):
+                self.status("La tabla de comprobantes no cambió desde la última lectura; se usa la copia guardada")
+                return self.listing_cache.comprobantes(cached)
+        
+        # Extraer la tabla completa en una sola transferencia del DOM
+        comprobantes = parse_comprobantes(html if html is not None else driver.page_source, self.identificacion)
+        if self.listing_cache is not None and comprobantes:
+            new = self.listing_cache.store(self.identificacion, comprobantes, etag=etag, last_modified=last_modified)
+            if cached is not None:
+                self.status(f"Comprobantes nuevos desde la última lectura de la tabla: {len(new)}")
+        return comprobantes
+    
+    def logout(self, driver):
+        """
+        Cierra la sesión del portal haciendo clic en el botón de desconexión.
+        """
+        try:
+            # Cerrar sesión haciendo clic en el botón de desconexión antes de cerrar el navegador
+            self.status("Cerrando sesión...")
+            
+            # Buscar el botón de desconexión (hay dos posibles elementos en la página)
+            try:
+                # Intenta primero con el botón principal de desconexión
+                logout_button = driver.find_element(By.ID, "rn_LogoutLink_4_LogoutLink")
+                driver.execute_script("arguments[0].click();", logout_button)
+                self.status("Sesión cerrada correctamente")
+                self.wait_until(driver, EC.staleness_of(logout_button), "logout")  # Esperar a que se procese el cierre de sesión
+            except:
+                try:
+                    # Si no funciona, intenta con el segundo botón de desconexión
+                    logout_button = driver.find_element(By.ID, "rn_LogoutLink_8_LogoutLink")
+                    driver.execute_script("arguments[0].click();", logout_button)
+                    self.status("Sesión cerrada correctamente")
+                    self.wait_until(driver, EC.staleness_of(logout_button), "logout")  # Esperar a que se procese el cierre de sesión
+                except Exception as e:
+                    self.status(f"No se pudo cerrar sesión automáticamente: {str(e)}")
+        except Exception as e:
+            self.status(f"Error al intentar cerrar sesión: {str(e)}")
+    
+    def load_listing(self, driver):
+        """
+        Abre la página de comprobantes y espera a que aparezcan las filas de la tabla.
+        
+        Returns:
+            True si aparecieron las filas dentro del tiempo máximo
+        """
+        with self.metrics.span("tabla_comprobantes"):
+            self.detail("Navegando directamente a la página de comprobantes...")
+            driver.get(LISTING_URL)
+            self.detail("Navegación a la página de comprobantes realizada")
+            
+            # Esperar a que se cargue la página de comprobantes
+            self.detail("Esperando a que se cargue la página de comprobantes...")
+            if not self.wait_until(driver, EC.presence_of_all_elements_located((By.CSS_SELECTOR, ".boton-estilo")),
+                                   "listing"):
+                self.debug.capture(driver, screenshot="fallo_tabla_comprobantes.png",
+                                   html_name="fallo_tabla_comprobantes.html", failure=True)
+                return False
+            return True
+    
+    def select_identificacion(self, driver, identificacion):
+        """
+        Prepara la descarga de una identificación sin volver a iniciar sesión.
+        
+        Actualiza el campo numiden de la página y abre el diario del trabajo
+        (identificación + rango de fechas) para poder reanudarlo.
+        """
+        self.apply_identificacion(driver, identificacion)
+        self.open_job(identificacion)
+    
+    def apply_identificacion(self, driver, identificacion):
+        """
+        Escribe la identificación en el campo numiden de la página de comprobantes.
+        """
+        # Modificar el campo numiden para usar el identificador personalizado
+        self.detail(f"Modificando el número de identificación a: {identificacion}")
+        driver.execute_script("document.getElementById('numiden').value = arguments[0];", identificacion)
+    
+    def open_job(self, identificacion):
+        """
+        Fija la identificación en curso y abre su diario de trabajo.
+        """
+        self.identificacion = identificacion
+        if self.dry_run:
+            self.journal = None
+            return
+        self.journal = JobJournal(self.download_dir, f"{identificacion}:{self.planner.job_key()}")
+    
+    def start_network_capture(self, driver):
+        """
+        Activa el dominio Network de DevTools en la pestaña actual y descarta los eventos anteriores.
+        """
+        driver.execute_cdp_cmd("Network.enable", {
+            "maxTotalBufferSize": CDP_BUFFER_SIZE,
+            "maxResourceBufferSize": CDP_BUFFER_SIZE,
+        })
+        driver.get_log("performance")
+    
+    def capture_pdf_response(self, driver, filepath):
+        """
+        Obtiene por DevTools el cuerpo original de la respuesta PDF cargada en la pestaña actual.
+        
+        Recorre los eventos Network.responseReceived / Network.loadingFinished del
+        registro de rendimiento y, cuando la respuesta PDF termina de llegar, pide su
+        cuerpo con Network.getResponseBody: sin volver a renderizar, sin pasar por
+        JavaScript y sin una segunda petición HTTP.
+        
+        Si el documento principal de la pestaña termina de cargarse y no es un PDF (por
+        ejemplo, una página HTML con el PDF incrustado como data: URL), no llegará
+        ninguna respuesta PDF y se deja de esperar enseguida.
+        
+        Returns:
+            True si se guardó el PDF, False si no se detectó una respuesta PDF a tiempo
+            o DevTools no pudo entregarla (se sigue con los demás métodos)
+        """
+        try:
+            return self.read_pdf_response(driver, filepath)
+        except Exception as e:
+            # getResponseBody suele fallar con los documentos que abre el visor de PDF
+            self.status(f"✗ No se pudo leer la respuesta desde DevTools: {str(e)}")
+            return False
+    
+    def read_pdf_response(self, driver, filepath):
+        """
+        Espera la respuesta PDF en el registro de rendimiento y guarda su cuerpo (ver capture_pdf_response).
+        """
+        deadline = time.time() + self.timeouts["pdf"]
+        pdf_request_id = None
+        document_request_id = None
+        document_is_pdf = False
+        finished = set()
+        while time.time() < deadline:
+            for entry in driver.get_log("performance"):
+                message = json.loads(entry["message"])["message"]
+                params = message.get("params", {})
+                if message.get("method") == "Network.responseReceived":
+                    is_pdf = "pdf" in params["response"].get("mimeType", "").lower()
+                    if document_request_id is None and params.get("type") == "Document":
+                        document_request_id = params["requestId"]
+                        document_is_pdf = is_pdf
+                    if pdf_request_id is None and is_pdf:
+                        pdf_request_id = params["requestId"]
+                elif message.get("method") == "Network.loadingFinished":
+                    finished.add(params["requestId"])
+            
+            if pdf_request_id is not None and pdf_request_id in finished:
+                body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": pdf_request_id})
+                if body.get("base64Encoded"):
+                    return save_base64_stream(body["body"], filepath)
+                data = body["body"].encode("latin-1")
+                if data[:4] != b"%PDF":
+                    return False
+                write_file_atomic(filepath, data)
+                return True
+            if pdf_request_id is None and document_request_id in finished and not document_is_pdf:
+                self.detail("La página del comprobante no es una respuesta PDF")
+                return False
+            time.sleep(POLL_FREQUENCY)
+        return False
+    
+    def click_and_wait_for_download(self, driver, download_button, filepath, timeout=30):
+        """
+        Hace clic en un botón de descarga, espera el PDF y lo guarda en filepath.
+        
+        Chrome descarga el archivo en un directorio nuevo, propio de este clic, de modo
+        que ni una descarga tardía de un clic anterior ni los archivos que escribe el
+        motor en el directorio de descarga se confunden con el de este clic. El
+        directorio se borra siempre al terminar.
+        
+        Args:
+            driver: Instancia del navegador Selenium
+            download_button: Elemento web del botón de descarga
+            filepath: Ruta final del archivo
+            timeout: Tiempo máximo de espera en segundos
+        
+        Returns:
+            filepath si se descargó y guardó el PDF, o None si no se detectó ninguna
+            descarga o no se pudo guardar
+        """
+        clicks_root = os.path.join(self.download_dir, CLICK_DOWNLOADS_DIRNAME)
+        os.makedirs(clicks_root, exist_ok=True)
+        click_dir = tempfile.mkdtemp(prefix="clic_", dir=clicks_root)
+        try:
+            pdf_path = self.wait_for_click_download(driver, download_button, click_dir, timeout)
+            if not pdf_path:
+                self.status(f"✗ No se detectó descarga automática del PDF después de {timeout} segundos")
+                return None
+            
+            self.status(f"✓ Descarga detectada: {os.path.basename(pdf_path)}")
+            try:
+                os.replace(pdf_path, filepath)
+            except OSError as e:
+                # Otro sistema de archivos o destino bloqueado: se copia en su lugar
+                self.status(f"✗ Error al renombrar el archivo ({str(e)}); se copia al destino")
+                try:
+                    shutil.copyfile(pdf_path, filepath)
+                except OSError as e:
+                    self.status(f"✗ No se pudo guardar el archivo descargado: {str(e)}")
+                    return None
+            self.status(f"✓ Archivo guardado: {os.path.basename(pdf_path)} → {os.path.basename(filepath)}")
+            return filepath
+        finally:
+            # Una descarga que llegue tarde ya no tiene dónde guardarse
+            shutil.rmtree(click_dir, ignore_errors=True)
+            try:
+                # Solo se borra si no quedan directorios de otros clics
+                os.rmdir(clicks_root)
+            except OSError:
+                pass
+    
+    def wait_for_click_download(self, driver, download_button, click_dir, timeout):
+        """
+        Dirige las descargas del navegador a click_dir, hace clic y espera el archivo terminado.
+        
+        Returns:
+            Ruta del archivo descargado en click_dir, o None si no llegó a tiempo
+        """
+        watcher = DownloadWatcher(click_dir)
+        watcher.start()
+        if not watcher.uses_events and not self.warned_no_watchdog:
+            self.warned_no_watchdog = True
+            self.status("Advertencia: el paquete 'watchdog' no está instalado; se sondeará el directorio de descarga")
+        try:
+            ticket = watcher.expect()
+            driver.execute_cdp_cmd("Browser.setDownloadBehavior",
+                                   {"behavior": "allow", "downloadPath": os.path.abspath(click_dir)})
+            try:
+                # Hacer clic en el botón de descarga
+                self.detail(f"Haciendo clic en el botón de descarga...")
+                driver.execute_script("arguments[0].click();", download_button)
+                
+                # Esperar a que el archivo tenga su nombre definitivo y un tamaño estable
+                with self.metrics.span("espera_descarga_clic"):
+                    return watcher.wait(ticket, timeout)
+            finally:
+                driver.execute_cdp_cmd("Browser.setDownloadBehavior",
+                                       {"behavior": "allow", "downloadPath": os.path.abspath(self.download_dir)})
+        finally:
+            watcher.stop()
+
+    def descargar_comprobantes(self, driver, html=None, http_session=None, comprobantes=None):
+        """
+        Método principal para descargar los comprobantes de pago
+        
+        Args:
+            driver: Instancia del navegador Selenium, o None si se trabaja solo por HTTP
+            html: HTML de la página de comprobantes (por defecto, driver.page_source)
+            http_session: Sesión HTTP autenticada; si no se indica se crea a partir del navegador
+            comprobantes: Tabla ya leída (por ejemplo, la copia guardada); si no se indica
+                se lee de html o del navegador
+        
+        Returns:
+            Lista de comprobantes que quedaron sin descargar
+        """
+        try:
+            if comprobantes is None:
+                self.detail("Leyendo la tabla de comprobantes...")
+                comprobantes = self.read_listing(driver, html)
+            
+            if not comprobantes:
+                if driver is not None:
+                    # La página del navegador debía tener la tabla: no es un resultado vacío
+                    raise RuntimeError("No se encontraron botones de descarga en la tabla de comprobantes")
+                self.status("¡Advertencia! No se encontraron botones de descarga.")
+                return []
+            
+            self.status(f"Se encontraron {len(comprobantes)} comprobantes disponibles.")
+            self.count("found", len(comprobantes))
+            self.detail(f"URLs actualizadas con el número de identificación {self.identificacion}")
+            
+            # Seleccionar los comprobantes y estimar la descarga antes de empezarla
+            total, pending = self.plan_downloads(comprobantes)
+            if self.dry_run:
+                self.count("skipped", total - len(pending))
+                self.status("Simulación: no se descarga ningún comprobante")
+                return []
+            
+            # Registrar el trabajo en el diario; al reanudar se continúa con lo no completado
+            if self.journal is not None:
+                before = len(pending)
+                pending = self.journal.start(pending, resume=self.resume)
+                if self.resume and before != len(pending):
+                    self.status(f"Reanudando trabajo: {before - len(pending)} comprobantes ya completados, {len(pending)} pendientes")
+            
+            self.count("skipped", total - len(pending))
+            
+            # En modo HTTP se exportan las cookies del navegador a una sesión reutilizable
+            # y los comprobantes se descargan en paralelo; el navegador queda como respaldo
+            if http_session is not None:
+                pending = self.download_all_via_http(http_session, pending, driver)
+            elif self.download_mode == MODE_HTTP:
+                self.detail("Método HTTP: exportando la sesión del navegador...")
+                http_session = create_http_session(driver, pool_size=max(HTTP_POOL_SIZE, self.concurrency))
+                try:
+                    pending = self.download_all_via_http(http_session, pending, driver)
+                finally:
+                    http_session.close()
+            
+            if driver is None:
+                # Sin navegador no hay métodos de respaldo
+                return pending
+            if pending and self.is_running:
+                self.status(f"{len(pending)} comprobantes no se obtuvieron por HTTP, usando el navegador...")
+            
+            remaining = []
+            for idx, comp in enumerate(pending, 1):
+                if not self.is_running:
+                    self.status("Proceso cancelado por el usuario")
+                    remaining.extend(pending[idx - 1:])
+                    break
+                
+                year = comp["year"]
+                month_name = comp["month_name"]
+                nomina_type = comp["nomina_type"]
+                consecutivo = comp["consecutivo"]
+                
+                progress_pct = int((idx / len(pending)) * 100)
+                self.progress(progress_pct, f"Descargando {idx}/{len(pending)}: {year} - {month_name} - {nomina_type}")
+                self.detail(f"Descargando comprobante: {year} - {month_name} - {nomina_type} (Consecutivo: {consecutivo})")
+                
+                self.mark_state(comp, STATE_IN_PROGRESS)
+                attempt = 0
+                while True:
+                    attempt += 1
+                    # Pausa entre descargas para no sobrecargar el servidor (se ajusta con sus respuestas)
+                    self.browser_limiter.acquire()
+                    generation = self.session_generation
+                    start_time = time.perf_counter()
+                    with self.metrics.span("comprobante_navegador", detail=consecutivo):
+                        (saved_path, method) = self.download_via_browser(driver, comp, comp["filepath"])
+                    self.browser_limiter.record(time.perf_counter() - start_time, None if saved_path else ERROR_BROWSER)
+                    if saved_path and self.verify_download(saved_path) is not None:
+                        saved_path = None
+                    if saved_path or not self.is_running:
+                        break
+                    # Si la sesión caducó, se inicia sesión de nuevo y se repite el comprobante
+                    if not self.browser_session_valid(driver):
+                        if self.renew_session(generation, driver):
+                            continue
+                        break
+                    if not self.retry_policy.should_retry(ERROR_BROWSER, attempt):
+                        break
+                    self.retry_later(comp, attempt, ERROR_BROWSER)
+                
+                if saved_path:
+                    self.mark_downloaded(comp, saved_path, method)
+                else:
+                    self.mark_state(comp, STATE_FAILED, "No se obtuvo un PDF con el navegador")
+                    self.count("failed")
+                    remaining.append(comp)
+            
+            self.status(f"Proceso de descarga completado. Se intentaron descargar {total} comprobantes.")
+            return remaining
+        
+        except Exception as e:
+            self.status(f"Error durante la descarga de comprobantes: {str(e)}\n{traceback.format_exc()}")
+            raise
+    
+    def plan_downloads(self, comprobantes):
+        """
+        Selecciona los comprobantes de la identificación en curso y calcula el plan de descarga.
+        
+        Aplica los rangos de meses y tipos de nómina, asigna la ruta de destino, descarta
+        lo que ya está en el manifiesto e informa cuántos comprobantes quedan y su tamaño
+        y duración estimados según el historial del directorio de descarga.
+        
+        Returns:
+            Tupla (número de comprobantes seleccionados, lista de comprobantes pendientes)
+        """
+        selected = self.planner.select(comprobantes)
+        total = len(selected)
+        self.count("selected", total)
+        self.status(f"Se seleccionaron {total} comprobantes según los filtros establecidos")
+        
+        # Ruta de destino de cada comprobante
+        for comp in selected:
+            comp["filepath"] = os.path.join(self.download_dir, receipt_filename(self.identificacion, comp))
+        
+        # Omitir los comprobantes que ya están en disco y coinciden con el manifiesto
+        pending = selected
+        if self.manifest is not None:
+            pending = [comp for comp in selected
+                       if not self.manifest.is_complete(self.identificacion, comp["consecutivo"])]
+            skipped = total - len(pending)
+            if skipped:
+                self.status(f"Se omiten {skipped} comprobantes ya descargados (manifiesto: {self.manifest.path})")
+        
+        manifest = self.manifest if self.manifest is not None else DownloadManifest(self.download_dir)
+        average_size, seconds = load_history(self.download_dir, list(manifest.entries.values()), self.download_mode)
+        # Por HTTP los comprobantes se descargan en paralelo; con el navegador, uno tras otro
+        concurrency = self.concurrency if self.download_mode == MODE_HTTP else 1
+        self.status(format_plan(len(pending), *estimate_plan(len(pending), average_size, seconds, concurrency)))
+        return total, pending
+    
+    def plan_from_listing_cache(self):
+        """
+        Calcula el plan con las tablas guardadas, sin abrir el navegador.
+        
+        Returns:
+            True si todas las identificaciones tienen una tabla guardada vigente y no
+            queda nada por descargar (o es una simulación); False si hace falta el navegador
+        """
+        if self.listing_cache is None:
+            return False
+        entries = [self.listing_cache.get(identificacion) for identificacion in self.identificaciones]
+        if not all(self.listing_cache.is_fresh(entry) for entry in entries):
+            return False
+        
+        self.status("Calculando el plan con las tablas de comprobantes guardadas...")
+        for identificacion, entry in zip(self.identificaciones, entries):
+            self.open_job(identificacion)
+            comprobantes = self.listing_cache.comprobantes(entry)
+            self.count("found", len(comprobantes))
+            total, pending = self.plan_downloads(comprobantes)
+            if pending and not self.dry_run:
+                return False
+            self.count("skipped", total - len(pending))
+        if not self.dry_run:
+            self.status("No hay comprobantes nuevos por descargar; no se abre el navegador")
+        return True
+    
+    def mark_downloaded(self, comp, filepath, method):
+        """
+        Registra en el manifiesto, en el diario y en las métricas un comprobante descargado correctamente.
+        
+        Args:
+            comp: Diccionario con los datos del comprobante
+            filepath: Ruta del PDF guardado
+            method: Método con el que se obtuvo ("http", "1.0" a "1.3", "2" o "3")
+        """
+        self.count("downloaded")
+        self.relogins_since_download = 0
+        self.metrics.count_method(method, os.path.getsize(filepath))
+        sha256 = file_sha256(filepath)
+        if self.manifest is not None:
+            # El mismo comprobante guardado antes con otro nombre se conserva una sola vez en disco
+            duplicate = self.manifest.find_duplicate(sha256, filepath)
+            if duplicate is not None and link_duplicate(duplicate, filepath):
+                self.status(f"Contenido idéntico a {os.path.basename(duplicate)}; se guardó como enlace duro")
+            self.manifest.record(self.identificacion, comp["consecutivo"], filepath, sha256=sha256)
+        if self.journal is not None:
+            self.journal.mark(comp, STATE_DONE, path=filepath)
+    
+    def verify_download(self, filepath):
+        """
+        Valida el PDF guardado; si está incompleto o dañado se elimina para volver a descargarlo.
+        
+        Returns:
+            None si el archivo es válido, ERROR_INVALID_PDF si no
+        """
+        reason = validate_pdf(filepath)
+        if reason is None:
+            return None
+        self.status(f"✗ El PDF guardado no es válido ({reason}): {os.path.basename(filepath)}")
+        try:
+            os.remove(filepath)
+        except OSError:
+            pass
+        return ERROR_INVALID_PDF
+    
+    def mark_state(self, comp, state, reason=None):
+        """
+        Registra en el diario el estado de un comprobante.
+        """
+        if self.journal is not None:
+            self.journal.mark(comp, state, reason=reason)
+    
+    def host_slot(self, url):
+        """
+        Devuelve el semáforo que limita las descargas simultáneas contra el host de la URL.
+        """
+        host = urlparse(url).netloc
+        with self.host_slots_lock:
+            if host not in self.host_slots:
+                self.host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self.host_slots[host]
+    
+    def download_all_via_http(self, session, comprobantes, driver=None):
+        """
+        Descarga los comprobantes por HTTP con la canalización asíncrona (DownloadPipeline).
+        
+        Las peticiones se hacen en un grupo acotado de hilos de red y la validación,
+        el hash y el registro en el manifiesto en un hilo de disco aparte. El progreso
+        se informa en el orden de la lista aunque las descargas terminen desordenadas,
+        y al detener el proceso no se inician más descargas.
+        
+        Args:
+            session: Sesión de requests con las cookies del navegador
+            comprobantes: Lista de comprobantes filtrados (con su ruta en "filepath")
+            driver: Navegador con el que renovar la sesión si caduca (None sin navegador)
+        
+        Returns:
+            Lista de comprobantes que no se pudieron descargar por HTTP
+        """
+        total = len(comprobantes)
+        if not total:
+            return []
+        
+        def fetch(comp, attempt):
+            if attempt == 1:
+                self.mark_state(comp, STATE_IN_PROGRESS)
+                self.detail(f"Descargando comprobante: {comp['year']} - {comp['month_name']} - {comp['nomina_type']} (Consecutivo: {comp['consecutivo']})")
+            while not self.session_lost:
+                self.http_limiter.acquire()
+                generation = self.session_generation
+                start_time = time.perf_counter()
+                with self.host_slot(comp["url"]), self.metrics.span("comprobante_http", detail=comp["consecutivo"]):
+                    error = self.download_via_http(session, comp["url"], comp["filepath"])
+                self.http_limiter.record(time.perf_counter() - start_time, error)
+                # Sesión caducada: se renueva una sola vez para todos los hilos y se repite la petición
+                if error == ERROR_SESSION and self.is_running and self.renew_session(generation, driver, http_session=session):
+                    continue
+                return error
+            return ERROR_SESSION
+        
+        def finish(comp):
+            error = self.verify_download(comp["filepath"])
+            if error is None:
+                self.mark_downloaded(comp, comp["filepath"], "http")
+            return error
+        
+        def retry(comp, attempt, error):
+            if error == ERROR_SESSION or self.session_lost or not self.retry_policy.should_retry(error, attempt):
+                return None
+            return self.retry_delay(comp, attempt, error)
+        
+        results = [None] * total
+        next_to_report = 0
+        
+        def on_result(idx, ok, error):
+            nonlocal next_to_report
+            results[idx] = ok
+            if not ok:
+                self.mark_state(comprobantes[idx], STATE_FAILED, f"No se obtuvo un PDF por HTTP ({error})")
+            # Informar el progreso en orden
+            while next_to_report < total and results[next_to_report] is not None:
+                comp = comprobantes[next_to_report]
+                next_to_report += 1
+                progress_pct = int((next_to_report / total) * 100)
+                self.progress(progress_pct, f"Descargando {next_to_report}/{total}: {comp['year']} - {comp['month_name']} - {comp['nomina_type']}")
+        
+        self.status(f"Descargando por HTTP con {self.concurrency} descargas simultáneas...")
+        pipeline = DownloadPipeline(fetch, finish, retry, on_result=on_result,
+                                    should_continue=lambda: self.is_running, concurrency=self.concurrency)
+        pipeline.run(comprobantes)
+        return [comp for comp, ok in zip(comprobantes, results) if not ok]
+    
+    def retry_later(self, comp, attempt, error):
+        """
+        Espera antes de reintentar un comprobante, según la política de reintentos.
+        """
+        self.pause(self.retry_delay(comp, attempt, error))
+    
+    def retry_delay(self, comp, attempt, error):
+        """
+        Cuenta y anuncia el reintento de un comprobante y devuelve la espera en segundos.
+        """
+        delay = self.retry_policy.delay(attempt)
+        self.count("retries")
+        self.status(f"Reintentando el comprobante {comp['consecutivo']} en {delay:.1f} s "
+                    f"(intento {attempt + 1}, fallo: {error})")
+        return delay
+    
+    def download_via_http(self, session, url, filepath):
+        """
+        Descarga un comprobante con una única petición HTTP usando la sesión autenticada.
+        
+        Args:
+            session: Sesión de requests con las cookies del navegador
+            url: URL del comprobante (data-url del botón)
+            filepath: Ruta de destino del PDF
+        
+        Returns:
+            None si la respuesta era un PDF y se guardó; si no, el tipo de fallo
+            (ERROR_TIMEOUT, ERROR_SERVER, ERROR_NOT_PDF, ERROR_SESSION, etc.)
+        """
+        try:
+            with session.get(url, timeout=HTTP_TIMEOUT, stream=True) as response:
+                if response.status_code != 200:
+                    self.status(f"✗ Error al descargar por HTTP. Código de estado: {response.status_code}")
+                    if response.status_code == 429:
+                        return ERROR_THROTTLED
+                    if response.status_code >= 500:
+                        return ERROR_SERVER
+                    if response.status_code in (401, 403):
+                        return ERROR_SESSION
+                    return ERROR_CLIENT
+                if not save_response_stream(response, filepath):
+                    content_type = response.headers.get("content-type", "")
+                    self.status(f"✗ La respuesta HTTP no es un PDF (Content-Type: {content_type})")
+                    # El portal redirige al formulario de inicio de sesión cuando la sesión caduca;
+                    # una página HTML en lugar del PDF se comprueba contra la página de la cuenta
+                    if "login" in response.url.lower() or not session_is_valid(session):
+                        return ERROR_SESSION
+                    return ERROR_NOT_PDF
+            self.status(f"✓ Comprobante guardado exitosamente en: {filepath}")
+            return None
+        except requests.Timeout as e:
+            self.status(f"✗ Se agotó el tiempo de espera de la descarga por HTTP: {str(e)}")
+            return ERROR_TIMEOUT
+        except requests.ConnectionError as e:
+            self.status(f"✗ Error de conexión durante la descarga por HTTP: {str(e)}")
+            return ERROR_CONNECTION
+        except Exception as e:
+            self.status(f"✗ Error durante la descarga por HTTP: {str(e)}")
+            return ERROR_UNKNOWN
+    
+    def download_via_browser(self, driver, comp, filepath):
+        """
+        Descarga un comprobante abriendo su URL en una pestaña nueva (Métodos 1 a 3).
+        
+        Args:
+            driver: Instancia del navegador Selenium
+            comp: Diccionario con los datos del comprobante
+            filepath: Ruta de destino del PDF
+        
+        Returns:
+            Tupla (ruta del PDF guardado, método que lo obtuvo); (None, None) si no se pudo
+            descargar
+        """
+        url = comp["url"]
+        
+        success = False
+        method = None
+        
+        try:
+            # Configurar Chrome para guardar los PDF
+            driver.execute_script("window.open('');")
+            driver.switch_to.window(driver.window_handles[1])
+            
+            # Mostrar overlay y spinner en la interfaz original
+            driver.switch_to.window(driver.window_handles[0])
+            driver.execute_script('''
+                document.getElementById('overlay').style.display = 'block';
+                document.getElementById('spinner-container').style.display = 'block';
+                document.getElementById('txtloader').textContent = 'Descargando Comprobante...';
+            ''')
+            driver.switch_to.window(driver.window_handles[1])
+            
+            # Registrar el tráfico de la pestaña nueva para capturar la respuesta original
+            if self.network_capture:
+                self.start_network_capture(driver)
+            
+            # Navegar a la URL del comprobante
+            driver.get(url)
+            self.detail(f"Esperando a que se cargue el PDF...")
+            
+            # Método 1.0: Tomar el cuerpo de la respuesta tal como llegó (DevTools)
+            if self.network_capture:
+                with self.metrics.span("metodo_1.0"):
+                    captured = self.capture_pdf_response(driver, filepath)
+                if captured:
+                    self.status(f"✓ Comprobante capturado desde la red en: {filepath}")
+                    success = True
+                    method = "1.0"
+                else:
+                    self.status(f"✗ No se capturó la respuesta PDF desde la red")
+            
+            # Esperar a que el PDF esté disponible (hasta el máximo configurado)
+            if not success:
+                self.wait_until(driver, pdf_content_ready, "pdf")
+            
+            # Verificar si es un PDF (el HTML leído se conserva para el archivo de depuración)
+            page_source = None
+            if not success and "pdf" not in driver.current_url.lower():
+                page_source = driver.page_source
+            if success:
+                pass  # Ya capturado desde la red
+            elif page_source is None or "application/pdf" in page_source.lower():
+                self.detail(f"PDF detectado, intentando extraer...")
+                
+                # Método 1.1: Intento directo desde el DOM
+                try:
+                    pdf_content = driver.execute_script("return document.querySelector('embed').src;")
+                    if pdf_content and pdf_content.startswith('data:application/pdf;base64,'):
+                        # Decodificar el contenido base64 por bloques a partir de la coma
+                        save_base64_stream(pdf_content, filepath, start=pdf_content.index(',') + 1, require_pdf=False)
+                        self.status(f"✓ Comprobante guardado exitosamente en: {filepath}")
+                        success = True
+                        method = "1.1"
+                    else:
+                        self.status(f"✗ No se pudo extraer el contenido PDF del embed")
+                except Exception as e:
+                    self.status(f"✗ Error al extraer desde embed: {str(e)}")
+                    
+                    # Método 1.2: Intentar con la URL directa si está en la barra de direcciones
+                    try:
+                        pdf_url = driver.current_url
+                        if pdf_url.endswith('.pdf') or 'pdf' in pdf_url:
+                            self.detail(f"Intentando descargar directamente desde la URL del PDF...")
+                            
+                            # Usar requests con las cookies de sesión para descargar
+                            cookies = driver.get_cookies()
+                            cookies_dict = {cookie['name']: cookie['value'] for cookie in cookies}
+                            
+                            with self.metrics.span("metodo_1.2"), \
+                                    requests.get(pdf_url, cookies=cookies_dict, timeout=30, verify=False, stream=True) as response:
+                                if response.status_code == 200 and response.headers.get('content-type', '').lower().find('pdf') != -1:
+                                    save_response_stream(response, filepath, require_pdf=False)
+                                    self.status(f"✓ Comprobante guardado exitosamente en: {filepath}")
+                                    success = True
+                                    method = "1.2"
+                                else:
+                                    self.status(f"✗ Error al descargar, código: {response.status_code}")
+                        else:
+                            self.status(f"✗ La URL no es un PDF directo")
+                    except Exception as e:
+                        self.status(f"✗ Error en descarga directa: {str(e)}")
+                        
+                        # Método 1.3: Intentar guardar como impresión PDF
+                        try:
+                            self.detail(f"Intentando guardar como impresión PDF...")
+                            with self.metrics.span("metodo_1.3"):
+                                pdf = driver.execute_cdp_cmd("Page.printToPDF", {
+                                    "printBackground": True,
+                                    "preferCSSPageSize": True,
+                                })
+                            if pdf and "data" in pdf:
+                                save_base64_stream(pdf["data"], filepath, require_pdf=False)
+                                self.status(f"✓ PDF guardado usando printToPDF en: {filepath}")
+                                success = True
+                                method = "1.3"
+                            else:
+                                self.status(f"✗ No se pudo imprimir a PDF")
+                        except Exception as e:
+                            self.status(f"✗ Error en impresión PDF: {str(e)}")
+            else:
+                # Si no es un PDF, guardar la página para análisis posterior (en segundo plano)
+                self.status(f"✗ No se detectó contenido PDF")
+                self.debug.capture(driver, html_name=f"{filepath}.html", html=page_source, failure=True)
+                
+                # Método 2: Intentar con requests directamente
+                if not success:
+                    try:
+                        self.detail(f"Método 2: Descargando mediante requests con cookies de sesión...")
+                        cookies = driver.get_cookies()
+                        cookies_dict = {cookie['name']: cookie['value'] for cookie in cookies}
+                        
+                        with self.metrics.span("metodo_2"), \
+                                requests.get(url, cookies=cookies_dict, timeout=30, verify=False, stream=True) as response:
+                            if response.status_code == 200:
+                                # Verificar si es un PDF por el tipo de contenido o la firma %PDF
+                                content_type = response.headers.get('content-type', '').lower()
+                                # Si no es un PDF, la respuesta se guarda en .response para análisis
+                                rejected_path = f"{filepath}.response" if self.debug.wants(failure=True) else None
+                                if save_response_stream(response, filepath, rejected_path=rejected_path):
+                                    self.status(f"✓ Comprobante guardado exitosamente en: {filepath}")
+                                    success = True
+                                    method = "2"
+                                else:
+                                    self.status(f"✗ La respuesta no es un PDF (Content-Type: {content_type})")
+                            else:
+                                self.status(f"✗ Error al descargar con requests. Código de estado: {response.status_code}")
+                    except Exception as e:
+                        self.status(f"✗ Error durante la descarga con requests: {str(e)}")
+            
+            # Ocultar overlay y spinner
+            driver.switch_to.window(driver.window_handles[0])
+            driver.execute_script('''
+                document.getElementById('overlay').style.display = 'none';
+                document.getElementById('spinner-container').style.display = 'none';
+            ''')
+            
+            # Cerrar la pestaña y volver a la principal
+            driver.switch_to.window(driver.window_handles[1])
+            driver.close()
+            driver.switch_to.window(driver.window_handles[0])
+            
+            # Verificar si se pudo descargar, si no intentar con el Método 3
+            if not success:
+                self.detail(f"Método 3: Haciendo clic en el botón directamente...")
+                try:
+                    # Localizar el botón de la fila y apuntarlo a la URL del comprobante
+                    button = driver.find_elements(By.CSS_SELECTOR, ".boton-estilo")[comp["index"]]
+                    if comp["url"] != comp["original_url"]:
+                        driver.execute_script("arguments[0].setAttribute('data-url', arguments[1]);", button, comp["url"])
+                    
+                    # Hacer clic, esperar la descarga y guardarla con el mismo nombre que
+                    # usan los demás métodos (receipt_filename)
+                    pdf_path = self.click_and_wait_for_download(driver, button, filepath,
+                                                                timeout=self.timeouts["download"])
+                    
+                    if pdf_path:
+                        success = True
+                        method = "3"
+                    else:
+                        self.status(f"✗ No se detectó descarga automática del PDF")
+                except Exception as e:
+                    self.status(f"✗ Error durante el clic en el botón: {str(e)}")
+        
+        except Exception as e:
+            self.status(f"✗ Error durante la descarga: {str(e)}")
+            
+            # Intentar cerrar la pestaña adicional si quedó abierta
+            try:
+                if len(driver.window_handles) > 1:
+                    driver.switch_to.window(driver.window_handles[1])
+                    driver.close()
+                    driver.switch_to.window(driver.window_handles[0])
+            except:
+                pass
+            
+            # Ocultar overlay y spinner si hubo error
+            try:
+                driver.execute_script('''
+                    document.getElementById('overlay').style.display = 'none';
+                    document.getElementById('spinner-container').style.display = 'none';
+                ''')
+            except:
+                pass
+        
+        return (filepath, method) if success else (None, None)
@@ -0,0 +1,427 @@
+"""
+Interfaz gráfica (PyQt5) para la descarga de comprobantes de pago de CREMIL.
+"""
+import sys
+import os
+import traceback
+from datetime import datetime
+
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
+                            QLabel, QLineEdit, QPushButton, QProgressBar, QComboBox, 
+                            QGroupBox, QGridLayout, QFileDialog, QPlainTextEdit, QSpinBox,
+                            QCheckBox, QMessageBox, QRadioButton)
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
+from PyQt5.QtGui import QFont, QIcon, QPixmap
+
+from cremil_downloader.activity_log import ActivityLog, MAX_VIEW_LINES
+from cremil_downloader.browser_pool import BrowserPool
+from cremil_downloader.debug_artifacts import DEBUG_OFF, DEBUG_ON_FAILURE, DEBUG_ALWAYS, DEFAULT_DEBUG_LEVEL
+from cremil_downloader.options import (MONTHS, MODE_HTTP, MODE_BROWSER, DEFAULT_CONCURRENCY, MAX_CONCURRENCY,
+                                       LOG_DETAIL, LOG_INFO)
+
+# Intervalo (en milisegundos) con el que la interfaz muestra los mensajes y el avance pendientes
+LOG_FLUSH_INTERVAL = 200
+
+
+class WorkerThread(QThread):
+    """
+    Ejecuta el DownloadEngine en un hilo aparte.
+    
+    Los mensajes se añaden al registro de actividad y el avance se guarda en
+    latest_progress; la interfaz recoge ambos en cada tick de su QTimer en lugar
+    de recibir una señal de Qt por cada mensaje.
+    """
+    finished_signal = pyqtSignal(bool, str)
+    
+    def __init__(self, activity_log, parent=None, **engine_options):
+        QThread.__init__(self, parent)
+        # El motor (Selenium, requests) se carga al iniciar la primera descarga, no al abrir la ventana
+        from cremil_downloader.engine import DownloadEngine
+        self.activity_log = activity_log
+        self.latest_progress = None
+        self.engine = DownloadEngine(on_status=activity_log.append,
+                                     on_progress=self.set_progress,
+                                     **engine_options)
+    
+    def set_progress(self, value, text):
+        # Solo importa el último avance; se reemplaza en una sola asignación
+        self.latest_progress = (value, text)
+    
+    def stop(self):
+        self.engine.stop()
+    
+    def run(self):
+        try:
+            self.engine.run()
+            self.finished_signal.emit(True, "Proceso completado con éxito")
+        except Exception as e:
+            error_msg = f"Error durante la ejecución: {str(e)}\n{traceback.format_exc()}"
+            self.activity_log.append(error_msg)
+            self.finished_signal.emit(False, error_msg)
+
+
+class CremilApp(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.worker_thread = None
+        self.shown_progress = None
+        # Mensajes pendientes de mostrar (con copia en un archivo rotativo)
+        self.activity_log = ActivityLog()
+        self.initUI()
+        self.log_timer = QTimer(self)
+        self.log_timer.timeout.connect(self.flush_log)
+        self.log_timer.start(LOG_FLUSH_INTERVAL)
+        # Navegadores que quedan iniciados entre descargas consecutivas
+        self.browser_pool = BrowserPool()
+    
+    # Añade este método a la clase CremilApp
+    def get_resource_path(self, relative_path):
+        """
+        Devuelve la ruta del recurso, funciona tanto en desarrollo como en producción
+        """
+        try:
+            # Intentar obtener la ruta de PyInstaller si está disponible
+            base_path = getattr(sys, '_MEIPASS', None)
+            if base_path is None:
+                # Si no estamos en un bundle de PyInstaller, usar la raíz del proyecto
+                base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        except Exception:
+            # En caso de cualquier error, usar la ruta actual
+            base_path = os.path.abspath(".")
+        
+        return os.path.join(base_path, relative_path)
+
+    def initUI(self):
+        self.setWindowTitle("CREMIL - Descarga de Comprobantes de Pago")
+        self.setGeometry(100, 100, 800, 700)
+        
+        # Establecer el ícono de la ventana (añade estas líneas)
+        icon_path = self.get_resource_path('icon.ico')
+        self.setWindowIcon(QIcon(icon_path))
+        
+        # Widget principal
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        main_layout = QVBoxLayout(central_widget)
+        
+        # Grupo de configuración
+        config_group = QGroupBox("Configuración de la descarga")
+        config_layout = QGridLayout()
+        config_group.setLayout(config_layout)
+        
+        # Fila 1: Credenciales
+        config_layout.addWidget(QLabel("Usuario:"), 0, 0)
+        self.username_input = QLineEdit("14835184")
+        config_layout.addWidget(self.username_input, 0, 1)
+        
+        config_layout.addWidget(QLabel("Contraseña:"), 0, 2)
+        self.password_input = QLineEdit("Colombia2025*")
+        self.password_input.setEchoMode(QLineEdit.Password)
+        config_layout.addWidget(self.password_input, 0, 3)
+        
+        # Fila 2: Identificación
+        config_layout.addWidget(QLabel("Número de identificación:"), 1, 0)
+        self.id_input = QLineEdit()
+        self.id_input.setPlaceholderText("Varias identificaciones separadas por comas usan un solo inicio de sesión")
+        config_layout.addWidget(self.id_input, 1, 1, 1, 3)
+        
+        # Fila 3: Rango de años
+        config_layout.addWidget(QLabel("Desde año:"), 2, 0)
+        self.year_from = QSpinBox()
+        self.year_from.setRange(2000, 2050)
+        self.year_from.setValue(datetime.now().year - 1)
+        config_layout.addWidget(self.year_from, 2, 1)
+        
+        config_layout.addWidget(QLabel("Hasta año:"), 2, 2)
+        self.year_to = QSpinBox()
+        self.year_to.setRange(2000, 2050)
+        self.year_to.setValue(datetime.now().year)
+        config_layout.addWidget(self.year_to, 2, 3)
+        
+        # Fila 4: Rango de meses
+        config_layout.addWidget(QLabel("Desde mes:"), 3, 0)
+        self.month_from = QComboBox()
+        self.month_from.addItems(MONTHS)
+        self.month_from.setCurrentIndex(0)  # Enero
+        config_layout.addWidget(self.month_from, 3, 1)
+        
+        config_layout.addWidget(QLabel("Hasta mes:"), 3, 2)
+        self.month_to = QComboBox()
+        self.month_to.addItems(MONTHS)
+        self.month_to.setCurrentIndex(11)  # Diciembre
+        config_layout.addWidget(self.month_to, 3, 3)
+        
+        # Fila 5: Directorio de descarga
+        config_layout.addWidget(QLabel("Directorio de descarga:"), 4, 0)
+        self.download_dir = QLineEdit(os.path.join(os.path.expanduser("~"), "Descargas", "ComprobantesCreMil"))
+        config_layout.addWidget(self.download_dir, 4, 1, 1, 2)
+        self.browse_button = QPushButton("Examinar...")
+        self.browse_button.clicked.connect(self.browse_directory)
+        config_layout.addWidget(self.browse_button, 4, 3)
+        
+        # Fila 6: Modo navegador
+        config_layout.addWidget(QLabel("Modo del navegador:"), 5, 0)
+        self.mode_layout = QHBoxLayout()
+        self.headless_radio = QRadioButton("Oculto (más rápido)")
+        self.headless_radio.setChecked(True)
+        self.visible_radio = QRadioButton("Visible (para depuración)")
+        self.mode_layout.addWidget(self.headless_radio)
+        self.mode_layout.addWidget(self.visible_radio)
+        config_layout.addLayout(self.mode_layout, 5, 1, 1, 3)
+        
+        # Fila 7: Modo de descarga
+        config_layout.addWidget(QLabel("Modo de descarga:"), 6, 0)
+        self.http_mode_check = QCheckBox("Descarga directa por HTTP (el navegador solo inicia sesión)")
+        self.http_mode_check.setChecked(True)
+        config_layout.addWidget(self.http_mode_check, 6, 1)
+        
+        config_layout.addWidget(QLabel("Descargas simultáneas:"), 6, 2)
+        self.concurrency_input = QSpinBox()
+        self.concurrency_input.setRange(1, MAX_CONCURRENCY)
+        self.concurrency_input.setValue(DEFAULT_CONCURRENCY)
+        config_layout.addWidget(self.concurrency_input, 6, 3)
+        
+        # Fila 8: Descarga incremental
+        self.incremental_check = QCheckBox("Omitir comprobantes ya descargados")
+        self.incremental_check.setChecked(True)
+        config_layout.addWidget(self.incremental_check, 7, 1)
+        
+        self.resume_check = QCheckBox("Reanudar el último trabajo interrumpido")
+        config_layout.addWidget(self.resume_check, 7, 2, 1, 2)
+        
+        # Fila 9: Sesión guardada
+        self.session_cache_check = QCheckBox("Recordar la sesión (cifrada) para no iniciar el navegador en la próxima ejecución")
+        self.session_cache_check.setChecked(True)
+        config_layout.addWidget(self.session_cache_check, 8, 1, 1, 3)
+        
+        # Fila 10: Captura de red en el navegador
+        self.network_capture_check = QCheckBox("Capturar el PDF desde la red (DevTools) cuando se use el navegador")
+        config_layout.addWidget(self.network_capture_check, 9, 1, 1, 3)
+        
+        # Fila 11: Archivos de depuración
+        config_layout.addWidget(QLabel("Archivos de depuración:"), 10, 0)
+        self.debug_artifacts_combo = QComboBox()
+        self.debug_artifacts_combo.addItem("Ninguno (más rápido)", DEBUG_OFF)
+        self.debug_artifacts_combo.addItem("Solo cuando algo falla", DEBUG_ON_FAILURE)
+        self.debug_artifacts_combo.addItem("Siempre (capturas de cada ejecución)", DEBUG_ALWAYS)
+        self.debug_artifacts_combo.setCurrentIndex(self.debug_artifacts_combo.findData(DEFAULT_DEBUG_LEVEL))
+        config_layout.addWidget(self.debug_artifacts_combo, 10, 1, 1, 3)
+        
+        # Fila 12: Nivel del registro
+        self.verbose_log_check = QCheckBox("Registro detallado (mostrar cada paso del proceso)")
+        config_layout.addWidget(self.verbose_log_check, 11, 1, 1, 3)
+        
+        # Fila 13: Simulación
+        self.dry_run_check = QCheckBox("Solo calcular el plan de descarga (cantidad, tamaño y tiempo estimados)")
+        config_layout.addWidget(self.dry_run_check, 12, 1, 1, 3)
+        
+        # Grupo de acciones
+        actions_group = QGroupBox("Acciones")
+        actions_layout = QHBoxLayout()
+        actions_group.setLayout(actions_layout)
+        
+        # Botones
+        self.start_button = QPushButton("Iniciar descarga")
+        self.start_button.setMinimumHeight(40)
+        self.start_button.clicked.connect(self.start_download)
+        actions_layout.addWidget(self.start_button)
+        
+        self.stop_button = QPushButton("Detener")
+        self.stop_button.setMinimumHeight(40)
+        self.stop_button.setEnabled(False)
+        self.stop_button.clicked.connect(self.stop_download)
+        actions_layout.addWidget(self.stop_button)
+        
+        self.open_folder_button = QPushButton("Abrir carpeta destino")
+        self.open_folder_button.setMinimumHeight(40)
+        self.open_folder_button.clicked.connect(self.open_folder)
+        actions_layout.addWidget(self.open_folder_button)
+        
+        # Grupo de progreso
+        progress_group = QGroupBox("Progreso")
+        progress_layout = QVBoxLayout()
+        progress_group.setLayout(progress_layout)
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setFixedHeight(25)
+        progress_layout.addWidget(self.progress_bar)
+        
+        self.progress_label = QLabel("Listo para iniciar")
+        progress_layout.addWidget(self.progress_label)
+        
+        # Log de actividad
+        log_group = QGroupBox("Registro de actividad")
+        log_layout = QVBoxLayout()
+        log_group.setLayout(log_layout)
+        
+        # La vista conserva las últimas líneas; el registro completo queda en el archivo
+        self.log_text = QPlainTextEdit()
+        self.log_text.setReadOnly(True)
+        self.log_text.setMaximumBlockCount(MAX_VIEW_LINES)
+        log_layout.addWidget(self.log_text)
+        
+        # Añadir todos los grupos al layout principal
+        main_layout.addWidget(config_group)
+        main_layout.addWidget(actions_group)
+        main_layout.addWidget(config_group)
+        main_layout.addWidget(actions_group)
+        main_layout.addWidget(progress_group)
+        main_layout.addWidget(log_group)
+        
+        # Inicializar
+        self.log("Aplicación iniciada. Configure los parámetros y haga clic en 'Iniciar descarga'")
+    
+    def log(self, message):
+        # Los mensajes de la interfaz pasan por el mismo registro y se muestran enseguida
+        self.activity_log.append(message)
+        self.flush_log()
+    
+    def flush_log(self):
+        """
+        Muestra de una vez los mensajes pendientes y el último avance del proceso.
+        """
+        lines = self.activity_log.drain()
+        if lines:
+            self.log_text.appendPlainText("\n".join(lines))
+            self.log_text.verticalScrollBar().setValue(self.log_text.verticalScrollBar().maximum())
+        
+        progress = self.worker_thread.latest_progress if self.worker_thread is not None else None
+        if progress is not None and progress != self.shown_progress:
+            self.shown_progress = progress
+            self.progress_bar.setValue(progress[0])
+            self.progress_label.setText(progress[1])
+    
+    def finished_slot(self, success, message):
+        self.flush_log()
+        self.start_button.setEnabled(True)
+        self.stop_button.setEnabled(False)
+        if success:
+            self.progress_label.setText("Descarga completada")
+            QMessageBox.information(self, "Proceso completado", "La descarga de comprobantes ha finalizado con éxito.")
+        else:
+            self.progress_label.setText("Error en la descarga")
+            QMessageBox.warning(self, "Error", f"El proceso falló: {message}")
+    
+    def browse_directory(self):
+        dir_path = QFileDialog.getExistingDirectory(self, "Seleccionar directorio de destino", 
+                                                   self.download_dir.text())
+        if dir_path:
+            self.download_dir.setText(dir_path)
+    
+    def open_folder(self):
+        path = self.download_dir.text()
+        if not os.path.exists(path):
+            os.makedirs(path)
+        
+        # Abrir el explorador de archivos en la ruta especificada
+        if sys.platform == 'win32':
+            os.startfile(path)
+        else:
+            import subprocess
+            subprocess.Popen(['xdg-open', path])
+    
+    def start_download(self):
+        # Validar campos
+        identificaciones = [value.strip() for value in self.id_input.text().split(",") if value.strip()]
+        if not identificaciones:
+            QMessageBox.warning(self, "Campos incompletos", "Por favor ingrese un número de identificación.")
+            return
+        
+        if not self.download_dir.text():
+            QMessageBox.warning(self, "Campos incompletos", "Por favor seleccione un directorio de descarga.")
+            return
+        
+        if (self.year_from.value(), self.month_from.currentIndex()) > (self.year_to.value(), self.month_to.currentIndex()):
+            QMessageBox.warning(self, "Período inválido", "La fecha inicial debe ser anterior o igual a la fecha final.")
+            return
+        
+        # Configurar thread
+        self.shown_progress = None
+        self.worker_thread = WorkerThread(
+            self.activity_log,
+            identificacion=identificaciones[0],
+            identificaciones=identificaciones,
+            username=self.username_input.text(), 
+            password=self.password_input.text(),
+            year_from=self.year_from.value(),
+            year_to=self.year_to.value(),
+            month_from=self.month_from.currentIndex() + 1,
+            month_to=self.month_to.currentIndex() + 1,
+            download_dir=self.download_dir.text(),
+            headless=self.headless_radio.isChecked(),
+            download_mode=MODE_HTTP if self.http_mode_check.isChecked() else MODE_BROWSER,
+            concurrency=self.concurrency_input.value(),
+            incremental=self.incremental_check.isChecked(),
+            resume=self.resume_check.isChecked(),
+            session_cache=self.session_cache_check.isChecked(),
+            network_capture=self.network_capture_check.isChecked(),
+            debug_artifacts=self.debug_artifacts_combo.currentData(),
+            log_level=LOG_DETAIL if self.verbose_log_check.isChecked() else LOG_INFO,
+            dry_run=self.dry_run_check.isChecked(),
+            browser_pool=self.browser_pool
+        )
+        
+        # Conectar señales
+        self.worker_thread.finished_signal.connect(self.finished_slot)
+        
+        # Iniciar thread
+        self.worker_thread.start()
+        
+        # Actualizar UI
+        self.start_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
+        self.progress_bar.setValue(0)
+        self.progress_label.setText("Iniciando proceso...")
+        self.log("Proceso de descarga iniciado")
+    
+    def stop_download(self):
+        if self.worker_thread and self.worker_thread.isRunning():
+            self.log("Deteniendo el proceso...")
+            self.worker_thread.stop()
+            self.stop_button.setEnabled(False)
+            self.progress_label.setText("Deteniendo...")
+    
+    def closeEvent(self, event):
+        # Terminar la descarga en curso y cerrar los navegadores que quedaron iniciados
+        if self.worker_thread and self.worker_thread.isRunning():
+            self.worker_thread.stop()
+            self.worker_thread.wait()
+        self.browser_pool.close()
+        self.activity_log.close()
+        event.accept()
+
+
+def main():
+    app = QApplication(sys.argv)
+    
+    # Establecer estilo
+    app.setStyle("Fusion")
+    
+    # Fuente por defecto
+    font = QFont("Segoe UI", 9)
+    app.setFont(font)
+    
+    # Lista de posibles ubicaciones del ícono
+    icon_file = 'icon.ico'
+    locations = [
+        # Ubicación relativa
+        icon_file,
+        # Ubicación absoluta en la raíz del proyecto (junto al paquete)
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), icon_file),
+    ]
+    
+    # Agregar la ubicación de PyInstaller si estamos en un paquete
+    if getattr(sys, 'frozen', False):
+        locations.insert(0, os.path.join(sys._MEIPASS, icon_file))
+    
+    # La ventana se crea una sola vez, con el primer ícono que exista
+    icon_path = next((loc for loc in locations if os.path.exists(loc)), None)
+    if icon_path is not None:
+        app.setWindowIcon(QIcon(icon_path))
+    window = CremilApp()
+    window.show()
+    sys.exit(app.exec_())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Medición de tiempos por etapa e informe de rendimiento de cada ejecución.
+
+Cada etapa (inicio del navegador, inicio de sesión, carga de la tabla, descarga
+de cada comprobante, cada método de respaldo) se registra como un intervalo con
+su duración. Al terminar se escribe un informe en JSON (resumen por etapa,
+métodos que funcionaron y bytes guardados) y en CSV (un intervalo por fila) en
+el directorio de descarga, para comparar ejecuciones cuando cambia el portal.
+"""
+import csv
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Prefijo de los informes dentro del directorio de descarga
+REPORT_BASENAME = "informe_ejecucion"
+
+# Columnas del informe CSV
+SPAN_FIELDS = ["stage", "detail", "start", "seconds", "ok"]
+
+
+class RunMetrics:
+    """
+    Acumula los intervalos, los métodos de descarga y los bytes de una ejecución.
+    
+    Es segura entre hilos: las descargas HTTP en paralelo registran sus intervalos
+    en la misma instancia.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.spans = []
+        self.methods = {}
+        self.bytes = 0
+
+    @contextmanager
+    def span(self, stage, detail=""):
+        """
+        Mide la duración del bloque; si el bloque lanza una excepción el intervalo se marca como fallido.
+        """
+        start = time.perf_counter()
+        offset = time.time() - self.started
+        ok = True
+        try:
+            yield
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            self.add_span(stage, time.perf_counter() - start, detail=detail, offset=offset, ok=ok)
+
+    def add_span(self, stage, seconds, detail="", offset=None, ok=True):
+        if offset is None:
+            offset = time.time() - self.started - seconds
+        with self.lock:
+            self.spans.append({"stage": stage, "detail": detail, "start": round(offset, 3),
+                               "seconds": round(seconds, 3), "ok": ok})
+
+    def count_method(self, method, size=0):
+        """
+        Registra el método con el que se obtuvo un comprobante y el tamaño del archivo guardado.
+        """
+        with self.lock:
+            self.methods[method] = self.methods.get(method, 0) + 1
+            self.bytes += size
+
+    def stage_summary(self):
+        """
+        Resume los intervalos por etapa.
+        
+        Returns:
+            Diccionario etapa -> count, total, mean, min y max (en segundos), en orden de aparición
+        """
+        with self.lock:
+            spans = list(self.spans)
+        summary = {}
+        for span in spans:
+            durations = summary.setdefault(span["stage"], [])
+            durations.append(span["seconds"])
+        return {stage: {"count": len(durations), "total": round(sum(durations), 3),
+                        "mean": round(sum(durations) / len(durations), 3),
+                        "min": min(durations), "max": max(durations)}
+                for stage, durations in summary.items()}
+
+    def summary_line(self, stats):
+        """
+        Devuelve una línea de resumen para el registro de la interfaz o de la consola.
+        """
+        elapsed = time.time() - self.started
+        with self.lock:
+            methods = ", ".join(f"{method}: {count}" for method, count in sorted(self.methods.items()))
+            size = self.bytes
+        return (f"Resumen: {elapsed:.1f} s, {stats['downloaded']} descargados, {stats['failed']} fallidos, "
+                f"{stats['skipped']} omitidos, {size / 1024:.0f} KB"
+                + (f" (métodos: {methods})" if methods else ""))
+
+    def write_report(self, download_dir, stats, **info):
+        """
+        Escribe el informe de la ejecución en JSON y CSV con la fecha y hora en el nombre.
+        
+        Args:
+            download_dir: Directorio donde se guardan los informes
+            stats: Contadores del motor de descarga
+            info: Datos adicionales de la ejecución (identificaciones, modo, etc.)
+        
+        Returns:
+            Ruta del informe JSON
+        """
+        # Con microsegundos y creación exclusiva, dos ejecuciones en el mismo segundo
+        # no se sobrescriben el informe (load_history lee el más reciente)
+        stamp = datetime.fromtimestamp(self.started).strftime("%Y%m%d_%H%M%S_%f")
+        with self.lock:
+            spans = list(self.spans)
+            methods = dict(self.methods)
+            size = self.bytes
+        
+        report = dict(info)
+        report.update({
+            "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+            "seconds": round(time.time() - self.started, 3),
+            "stats": dict(stats),
+            "methods": methods,
+            "bytes": size,
+            "stages": self.stage_summary(),
+        })
+        base = os.path.join(download_dir, f"{REPORT_BASENAME}_{stamp}")
+        number = 1
+        while True:
+            try:
+                f = open(f"{base}.json", "x", encoding="utf-8")
+                break
+            except FileExistsError:
+                number += 1
+                base = os.path.join(download_dir, f"{REPORT_BASENAME}_{stamp}_{number}")
+        with f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        
+        with open(f"{base}.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=SPAN_FIELDS)
+            writer.writeheader()
+            writer.writerows(spans)
+        
+        return f"{base}.json"
@@ -0,0 +1,289 @@
+"""
+Portal de CREMIL simulado para pruebas y mediciones sin conexión.
+
+Reproduce lo que usa el motor de descarga: el formulario de inicio de sesión
+con los mismos identificadores (rn_LoginFormCremilv2_9_*), la página de la
+cuenta con el botón de desconexión, la tabla de descargarcomprobantes con un
+número configurable de filas .boton-estilo y el servicio de los PDF, con
+latencia y errores inyectables.
+
+Como el portal real, la URL de un comprobante abierta en una pestaña del
+navegador devuelve una página HTML con el PDF incrustado (<embed> con data: URL);
+las peticiones HTTP directas reciben el PDF y el clic en .boton-estilo lo
+descarga como adjunto.
+
+Uso:
+    portal = MockPortal(rows=60, latency=0.2, error_rate=0.05)
+    portal.start()
+    os.environ["CREMIL_PORTAL_URL"] = portal.base_url   # antes de importar el motor
+    ...
+    portal.stop()
+"""
+import base64
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Nombre de la cookie de sesión del portal simulado
+SESSION_COOKIE = "cremil_mock_sesion"
+
+MONTHS = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+          "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
+
+LOGIN_PAGE = """<html><body>
+<form method="post" action="/app/utils/login">
+  <input id="rn_LoginFormCremilv2_9_Username" name="usuario" type="text">
+  <input id="rn_LoginFormCremilv2_9_Password" name="contrasena" type="password">
+  <button id="rn_LoginFormCremilv2_9_Submit" type="submit">Ingresar</button>
+</form>
+</body></html>"""
+
+OVERVIEW_PAGE = """<html><body>
+<a id="rn_LogoutLink_4_LogoutLink" href="/app/logout">Salir</a>
+<p>Cuenta</p>
+</body></html>"""
+
+LISTING_PAGE = """<html><body>
+<a id="rn_LogoutLink_4_LogoutLink" href="/app/logout">Salir</a>
+<input id="numiden" value="{identificacion}">
+<div id="overlay" style="display:none"></div>
+<div id="spinner-container" style="display:none"><span id="txtloader"></span></div>
+<table>{rows}</table>
+<script>
+document.querySelectorAll('.boton-estilo').forEach(function (button) {{
+  button.addEventListener('click', function () {{
+    var link = document.createElement('a');
+    link.href = button.getAttribute('data-url') + '&descarga=1';
+    link.download = '';
+    document.body.appendChild(link);
+    link.click();
+    link.remove();
+  }});
+}});
+</script>
+</body></html>"""
+
+VIEWER_PAGE = """<html><body style="margin:0">
+<embed type="application/pdf" width="100%" height="100%" src="data:application/pdf;base64,{data}">
+</body></html>"""
+
+ROW_TEMPLATE = ('<tr><td>{year}</td><td>{month}</td><td>{tipo}</td>'
+                '<td><button class="boton-estilo" data-url="{url}">Descargar</button></td></tr>')
+
+
+def build_pdf(consecutivo, size):
+    """
+    Devuelve un PDF mínimo válido (con tabla xref y %%EOF) relleno hasta aproximadamente size bytes.
+    """
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b"<< /Type /Pages /Kids [] /Count 0 >>"]
+    body = b"%PDF-1.4\n" + f"% comprobante {consecutivo}\n".encode("ascii")
+    # Relleno en un comentario para alcanzar el tamaño pedido
+    body += b"%" + b"0" * max(0, size - 300) + b"\n"
+    offsets = []
+    for number, content in enumerate(objects, 1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj ".encode("ascii") + content + b" endobj\n"
+    xref_offset = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    for offset in offsets:
+        body += f"{offset:010d} 00000 n \n".encode("ascii")
+    body += f"trailer << /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("ascii")
+    return body
+
+
+class MockPortal:
+    """
+    Servidor HTTP local que imita las páginas del portal de CREMIL.
+    
+    Args:
+        rows: Número de comprobantes de la tabla (uno por mes, del más reciente hacia atrás)
+        latency: Segundos de espera antes de servir cada PDF
+        error_rate: Proporción de peticiones de PDF que responden con error 500
+        truncate_rate: Proporción de PDF que se envían cortados a la mitad
+        pdf_size: Tamaño aproximado de cada PDF en bytes
+        listing_latency: Segundos de espera antes de servir la tabla de comprobantes
+        last_year: Año del comprobante más reciente
+        session_pdfs: Si se indica, la sesión caduca tras servir ese número de PDF
+        seed: Semilla de los errores aleatorios, para repetir una medición
+    """
+
+    def __init__(self, rows=24, latency=0.0, error_rate=0.0, truncate_rate=0.0, pdf_size=50 * 1024,
+                 listing_latency=0.0, last_year=2025, session_pdfs=None, seed=0, port=0):
+        self.rows = rows
+        self.latency = latency
+        self.error_rate = error_rate
+        self.truncate_rate = truncate_rate
+        self.pdf_size = pdf_size
+        self.listing_latency = listing_latency
+        self.last_year = last_year
+        self.session_pdfs = session_pdfs
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        # Sesiones activas y PDF servidos a cada una
+        self.sessions = {}
+        self.requests = {"login": 0, "listing": 0, "pdf": 0, "errors": 0, "truncated": 0}
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_port}/app"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def comprobantes(self):
+        """
+        Devuelve las filas de la tabla: (año, mes, tipo, consecutivo).
+        """
+        rows = []
+        for position in range(self.rows):
+            year = self.last_year - position // 12
+            month = MONTHS[11 - position % 12]
+            rows.append((year, month, "Nomina", 1000 + position))
+        return rows
+
+    def inject_error(self, rate):
+        with self.lock:
+            return self.random.random() < rate
+
+    def expire_session(self, token):
+        """
+        Cuenta un PDF servido a la sesión y la cierra si alcanzó el límite (session_pdfs).
+        """
+        with self.lock:
+            if token not in self.sessions:
+                return True
+            if self.session_pdfs is None:
+                return False
+            self.sessions[token] += 1
+            if self.sessions[token] > self.session_pdfs:
+                self.sessions.pop(token, None)
+                return True
+            return False
+
+    def count(self, key):
+        with self.lock:
+            self.requests[key] += 1
+
+    def _handler_class(self):
+        portal = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def session_id(self):
+                for part in (self.headers.get("Cookie") or "").split(";"):
+                    name, _, value = part.strip().partition("=")
+                    if name == SESSION_COOKIE:
+                        return value
+                return None
+            
+            def authenticated(self):
+                return self.session_id() in portal.sessions
+            
+            def send_body(self, body, content_type="text/html; charset=utf-8", status=200, headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def redirect(self, location, headers=None):
+                headers = dict(headers or {}, Location=location)
+                self.send_body(b"", status=302, headers=headers)
+            
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(length)
+                if urlparse(self.path).path != "/app/utils/login":
+                    self.send_body(b"No encontrado", status=404)
+                    return
+                portal.count("login")
+                token = secrets.token_hex(16)
+                portal.sessions[token] = 0
+                self.redirect("/app/account/overview",
+                              headers={"Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/"})
+            
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                if url.path == "/app/utils/login_form":
+                    self.send_body(LOGIN_PAGE.encode("utf-8"))
+                elif url.path == "/app/logout":
+                    portal.sessions.pop(self.session_id(), None)
+                    self.redirect("/app/utils/login_form")
+                elif not self.authenticated():
+                    self.redirect("/app/utils/login_form")
+                elif url.path == "/app/account/overview":
+                    self.send_body(OVERVIEW_PAGE.encode("utf-8"))
+                elif url.path == "/app/descargarcomprobantes":
+                    self.listing()
+                elif url.path == "/app/comprobante":
+                    self.pdf(query.get("numConsecutivo", ["0"])[0], attachment="descarga" in query)
+                else:
+                    self.send_body(b"No encontrado", status=404)
+            
+            def listing(self):
+                portal.count("listing")
+                # La tabla solo cambia con el número de filas y el último año
+                etag = f'"{portal.rows}-{portal.last_year}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_body(b"", status=304, headers={"ETag": etag})
+                    return
+                if portal.listing_latency:
+                    time.sleep(portal.listing_latency)
+                rows = "".join(
+                    ROW_TEMPLATE.format(year=year, month=month, tipo=tipo,
+                                        url=f"{portal.base_url}/comprobante?numIdentificacion=1"
+                                            f"&numConsecutivo={consecutivo}")
+                    for year, month, tipo, consecutivo in portal.comprobantes())
+                self.send_body(LISTING_PAGE.format(identificacion=1, rows=rows).encode("utf-8"),
+                               headers={"ETag": etag})
+            
+            def pdf(self, consecutivo, attachment=False):
+                portal.count("pdf")
+                if portal.expire_session(self.session_id()):
+                    self.redirect("/app/utils/login_form")
+                    return
+                if portal.latency:
+                    time.sleep(portal.latency)
+                if portal.inject_error(portal.error_rate):
+                    portal.count("errors")
+                    self.send_body(b"Error interno simulado", status=500)
+                    return
+                pdf = build_pdf(consecutivo, portal.pdf_size)
+                if portal.inject_error(portal.truncate_rate):
+                    portal.count("truncated")
+                    pdf = pdf[:len(pdf) // 2]
+                if attachment:
+                    # Clic en el botón de la tabla: descarga como adjunto
+                    self.send_body(pdf, content_type="application/pdf",
+                                   headers={"Content-Disposition": f'attachment; filename="comprobante_{consecutivo}.pdf"'})
+                elif "text/html" in self.headers.get("Accept", ""):
+                    # Navegación de una pestaña: visor HTML con el PDF incrustado
+                    page = VIEWER_PAGE.format(data=base64.b64encode(pdf).decode("ascii"))
+                    self.send_body(page.encode("utf-8"))
+                else:
+                    self.send_body(pdf, content_type="application/pdf",
+                                   headers={"Content-Disposition": f'inline; filename="comprobante_{consecutivo}.pdf"'})
+        
+        return Handler
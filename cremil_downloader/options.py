@@ -0,0 +1,27 @@
+"""
+Opciones y constantes compartidas por el motor, la interfaz gráfica y la línea de comandos.
+
+Este módulo no importa dependencias pesadas (Selenium, requests, PyQt5), de modo
+que la interfaz puede construir sus controles sin cargar el motor de descarga,
+que se importa cuando empieza una descarga.
+"""
+import logging
+
+# Nombres de los meses tal como aparecen en la tabla de comprobantes
+MONTHS = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+          "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
+MONTHS_MAP = {name: num for num, name in enumerate(MONTHS, 1)}
+
+# Modos de descarga de los comprobantes
+MODE_BROWSER = "navegador"  # cada comprobante se abre en una pestaña del navegador
+MODE_HTTP = "http"          # el navegador solo inicia sesión; los PDF se piden por HTTP
+
+# Descargas HTTP simultáneas por defecto y máximo que aceptan la interfaz y la línea de comandos
+DEFAULT_CONCURRENCY = 4
+MAX_CONCURRENCY = 16
+
+# Niveles de los mensajes de estado: los de detalle describen cada paso del proceso
+# y solo se envían a on_status si log_level lo permite
+LOG_DETAIL = logging.DEBUG
+LOG_INFO = logging.INFO
+DEFAULT_LOG_LEVEL = LOG_INFO
@@ -0,0 +1,158 @@
+"""
+Canalización asíncrona (asyncio) de las descargas por HTTP.
+
+Cada comprobante pasa por tres etapas conectadas por colas acotadas:
+
+    productor -> cola de descarga -> N descargadores -> cola de verificación -> verificador
+
+Los descargadores ejecutan la petición en un grupo de hilos de red (requests es
+bloqueante) y el verificador valida el PDF, calcula su SHA-256 y lo registra en
+un hilo de disco aparte, de modo que el cálculo del hash y las escrituras del
+manifiesto no ocupan los hilos de red. Las colas acotadas aplican contrapresión:
+si el disco se retrasa, los descargadores esperan en lugar de acumular archivos
+sin verificar. Las esperas entre reintentos son asyncio.sleep() y no ocupan
+ningún hilo.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+# Frecuencia con la que se comprueba si hay que detener la canalización (en segundos)
+STOP_POLL_INTERVAL = 0.25
+
+
+class DownloadPipeline:
+    """
+    Descarga y verifica una serie de elementos con etapas asíncronas.
+    
+    Las funciones de cada etapa son bloqueantes y se ejecutan en hilos; los
+    callbacks retry y on_result se ejecutan en el hilo del bucle de eventos.
+    
+    Args:
+        fetch: fetch(item, attempt) descarga el elemento; devuelve None o el tipo de fallo
+        finish: finish(item) verifica y registra lo descargado; devuelve None o el tipo de fallo
+        retry: retry(item, attempt, error) devuelve los segundos de espera antes de
+            reintentar, o None si no se reintenta
+        on_result: on_result(index, ok, error) se llama una vez por elemento al terminar
+        should_continue: Función sin argumentos; al devolver False no se inician más descargas
+        concurrency: Descargas simultáneas (hilos de red)
+        queue_size: Capacidad de cada cola (por defecto, el doble de la concurrencia)
+    """
+
+    def __init__(self, fetch, finish, retry, on_result=None, should_continue=None, concurrency=4,
+                 queue_size=None):
+        self.fetch = fetch
+        self.finish = finish
+        self.retry = retry
+        self.on_result = on_result
+        self.should_continue = should_continue or (lambda: True)
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size or 2 * self.concurrency
+
+    def run(self, items):
+        """
+        Procesa los elementos con un bucle de eventos propio y espera a que terminen.
+        
+        Returns:
+            Lista con True o False por elemento, en el orden de entrada (si se detuvo el
+            proceso, los elementos que no llegaron a iniciarse no aparecen)
+        """
+        return asyncio.run(self.run_async(items))
+    
+    async def run_async(self, items):
+        loop = asyncio.get_running_loop()
+        fetch_queue = asyncio.Queue(maxsize=self.queue_size)
+        finish_queue = asyncio.Queue(maxsize=self.queue_size)
+        results = {}
+        state = {"produced": 0, "resolved": 0, "producing": True}
+        done = asyncio.Event()
+        retries = set()
+        
+        def resolve(index, ok, error=None):
+            results[index] = ok
+            state["resolved"] += 1
+            if self.on_result is not None:
+                self.on_result(index, ok, error)
+            if not state["producing"] and state["resolved"] == state["produced"]:
+                done.set()
+        
+        async def pause(seconds):
+            deadline = loop.time() + seconds
+            while self.should_continue() and loop.time() < deadline:
+                await asyncio.sleep(min(STOP_POLL_INTERVAL, deadline - loop.time()))
+        
+        async def requeue(index, item, attempt, delay):
+            await pause(delay)
+            if self.should_continue():
+                await fetch_queue.put((index, item, attempt + 1))
+            else:
+                resolve(index, False)
+        
+        def failed(index, item, attempt, error):
+            delay = self.retry(item, attempt, error) if self.should_continue() else None
+            if delay is None:
+                resolve(index, False, error)
+                return
+            # El reintento espera en su propia tarea para no retener al descargador
+            task = asyncio.create_task(requeue(index, item, attempt, delay))
+            retries.add(task)
+            task.add_done_callback(retries.discard)
+        
+        async def producer():
+            for index, item in enumerate(items):
+                if not self.should_continue():
+                    break
+                state["produced"] += 1
+                await fetch_queue.put((index, item, 1))
+            state["producing"] = False
+            if state["resolved"] == state["produced"]:
+                done.set()
+        
+        async def fetcher(network):
+            while True:
+                index, item, attempt = await fetch_queue.get()
+                try:
+                    if not self.should_continue():
+                        resolve(index, False)
+                        continue
+                    try:
+                        error = await loop.run_in_executor(network, self.fetch, item, attempt)
+                    except Exception as e:
+                        # Un error inesperado de la etapa no debe dejar el elemento sin resolver
+                        resolve(index, False, e)
+                        continue
+                    if error is None:
+                        # Contrapresión: si el verificador va atrasado se espera aquí
+                        await finish_queue.put((index, item, attempt))
+                    else:
+                        failed(index, item, attempt, error)
+                finally:
+                    fetch_queue.task_done()
+        
+        async def verifier(disk):
+            while True:
+                index, item, attempt = await finish_queue.get()
+                try:
+                    try:
+                        error = await loop.run_in_executor(disk, self.finish, item)
+                    except Exception as e:
+                        resolve(index, False, e)
+                        continue
+                    if error is None:
+                        resolve(index, True)
+                    else:
+                        failed(index, item, attempt, error)
+                finally:
+                    finish_queue.task_done()
+        
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="cremil_red") as network, \
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix="cremil_disco") as disk:
+            tasks = [asyncio.create_task(producer()), asyncio.create_task(verifier(disk))]
+            tasks += [asyncio.create_task(fetcher(network)) for _ in range(self.concurrency)]
+            try:
+                await done.wait()
+            finally:
+                for task in tasks + list(retries):
+                    task.cancel()
+                await asyncio.gather(*tasks, *retries, return_exceptions=True)
+        
+        return [results.get(index, False) for index in range(state["produced"])]
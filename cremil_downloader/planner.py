@@ -0,0 +1,190 @@
+"""
+Planificación de la descarga: selección de comprobantes y estimación previa.
+
+Cada comprobante se indexa por su mes como un entero (año * 12 + mes - 1), de
+modo que un rango de meses es un intervalo de enteros y una lista de rangos se
+resuelve con búsquedas binarias sobre las claves ordenadas de la tabla, sin
+comparar año y mes por separado. También se puede filtrar por tipo de nómina.
+
+Antes de descargar, estimate_plan() calcula los bytes y el tiempo aproximados
+de lo pendiente a partir del historial del directorio de descarga: el tamaño de
+los PDF registrados en el manifiesto y la duración media por comprobante del
+último informe de ejecución.
+"""
+import glob
+import json
+import os
+import unicodedata
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from cremil_downloader.metrics import REPORT_BASENAME
+from cremil_downloader.options import MODE_BROWSER, MODE_HTTP
+
+# Etapa del informe de ejecución con la duración de cada comprobante, por modo de descarga
+RECEIPT_STAGE = {MODE_HTTP: "comprobante_http", MODE_BROWSER: "comprobante_navegador"}
+
+
+def month_index(year, month):
+    """
+    Convierte un año y un mes (1-12) en un índice entero de meses consecutivos.
+    """
+    return year * 12 + month - 1
+
+
+def index_to_year_month(index):
+    """
+    Devuelve la tupla (año, mes) de un índice de month_index().
+    """
+    return index // 12, index % 12 + 1
+
+
+def merge_ranges(ranges):
+    """
+    Ordena los rangos (inicio, fin) de índices de meses y une los que se solapan o son contiguos.
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if start > end:
+            raise ValueError("El inicio de un rango de meses es posterior a su fin")
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def parse_month_ranges(text):
+    """
+    Convierte una lista de rangos "AAAA-MM:AAAA-MM" o meses sueltos "AAAA-MM",
+    separados por comas, en rangos de índices de meses.
+    
+    Raises:
+        ValueError: Si algún mes no tiene el formato AAAA-MM o un rango está invertido
+    """
+    ranges = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition(":")
+        start = datetime.strptime(first.strip(), "%Y-%m")
+        end = datetime.strptime(last.strip(), "%Y-%m") if last.strip() else start
+        ranges.append((month_index(start.year, start.month), month_index(end.year, end.month)))
+    if not ranges:
+        raise ValueError("No se indicó ningún mes")
+    return merge_ranges(ranges)
+
+
+def normalize_type(text):
+    """
+    Normaliza un tipo de nómina para compararlo sin mayúsculas ni tildes.
+    """
+    decomposed = unicodedata.normalize("NFKD", text.strip())
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+class DownloadPlanner:
+    """
+    Selecciona los comprobantes de la tabla que entran en los rangos de meses y tipos de nómina.
+    
+    Args:
+        ranges: Lista de rangos (inicio, fin) de índices de month_index(), ambos incluidos
+        nomina_types: Tipos de nómina aceptados (None para todos)
+    """
+
+    def __init__(self, ranges, nomina_types=None):
+        self.ranges = merge_ranges(ranges)
+        self.nomina_types = {normalize_type(value) for value in nomina_types} if nomina_types else None
+
+    @classmethod
+    def from_span(cls, year_from, month_from, year_to, month_to, nomina_types=None):
+        return cls([(month_index(year_from, month_from), month_index(year_to, month_to))], nomina_types)
+
+    def job_key(self):
+        """
+        Texto que identifica la selección en el diario de trabajo (para reanudar el mismo plan).
+        """
+        parts = []
+        for start, end in self.ranges:
+            (year_from, month_from), (year_to, month_to) = index_to_year_month(start), index_to_year_month(end)
+            parts.append(f"{year_from}-{month_from}:{year_to}-{month_to}")
+        key = ",".join(parts)
+        if self.nomina_types:
+            key += "|" + ",".join(sorted(self.nomina_types))
+        return key
+
+    def select(self, comprobantes):
+        """
+        Devuelve los comprobantes seleccionados, en el orden de la tabla.
+        
+        Los comprobantes sin año o mes reconocibles no entran en ningún rango.
+        """
+        keys = [month_index(comp["year"], comp["month_num"]) if comp["month_num"] else None
+                for comp in comprobantes]
+        available = sorted({key for key in keys if key is not None})
+        wanted = set()
+        for start, end in self.ranges:
+            wanted.update(available[bisect_left(available, start):bisect_right(available, end)])
+        
+        return [comp for comp, key in zip(comprobantes, keys)
+                if key in wanted
+                and (self.nomina_types is None or normalize_type(comp["nomina_type"]) in self.nomina_types)]
+
+
+def load_history(download_dir, manifest_entries, download_mode=MODE_HTTP):
+    """
+    Lee del directorio de descarga los datos para estimar una descarga.
+    
+    Args:
+        download_dir: Directorio de descarga con el manifiesto y los informes anteriores
+        manifest_entries: Entradas del manifiesto de descargas (con su campo size)
+        download_mode: Modo de descarga cuya duración por comprobante se busca
+    
+    Returns:
+        Tupla (tamaño medio de un PDF en bytes, segundos por comprobante); cada valor es
+        None si no hay historial
+    """
+    sizes = [entry["size"] for entry in manifest_entries if entry.get("size")]
+    average_size = sum(sizes) / len(sizes) if sizes else None
+    
+    seconds = None
+    stage = RECEIPT_STAGE.get(download_mode)
+    for path in sorted(glob.glob(os.path.join(download_dir, f"{REPORT_BASENAME}_*.json")), reverse=True):
+        try:
+            with open(path, encoding="utf-8") as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            continue
+        summary = report.get("stages", {}).get(stage)
+        if summary and summary.get("count"):
+            seconds = summary["mean"]
+            break
+    return average_size, seconds
+
+
+def estimate_plan(count, average_size, seconds, concurrency=1):
+    """
+    Estima bytes y segundos de una descarga de count comprobantes con concurrency descargas
+    simultáneas, a partir de la duración media de un comprobante.
+    
+    Returns:
+        Tupla (bytes, segundos); cada valor es None si no hay historial para estimarlo
+    """
+    estimated_bytes = round(count * average_size) if average_size is not None else None
+    estimated_seconds = count * seconds / max(1, concurrency) if seconds is not None else None
+    return estimated_bytes, estimated_seconds
+
+
+def format_plan(count, estimated_bytes, estimated_seconds):
+    """
+    Devuelve una línea con el plan de descarga para el registro.
+    """
+    parts = [f"Plan de descarga: {count} comprobantes pendientes"]
+    if count and estimated_bytes is not None:
+        parts.append(f"~{estimated_bytes / (1024 * 1024):.1f} MB")
+    if count and estimated_seconds is not None:
+        parts.append(f"~{estimated_seconds:.0f} s según la última ejecución")
+    if count and estimated_bytes is None and estimated_seconds is None:
+        parts.append("sin historial para estimar tamaño y tiempo")
+    return ", ".join(parts)
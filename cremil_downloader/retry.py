@@ -0,0 +1,132 @@
+"""
+Reintentos con espera exponencial y control adaptativo del ritmo de peticiones.
+
+Cada fallo de descarga se clasifica (tiempo agotado, error de conexión, 429,
+5xx, respuesta que no es PDF, sesión caducada...) y RetryPolicy decide si se
+reintenta y cuánto esperar: espera exponencial con variación aleatoria completa
+(full jitter) para que varias descargas no reintenten a la vez.
+
+AdaptiveRateLimiter reemplaza la pausa fija entre comprobantes: sube el ritmo
+mientras el portal responde rápido y lo reduce a la mitad ante un 429, un 5xx
+o un pico de latencia (aumento gradual, reducción brusca).
+"""
+import random
+import threading
+import time
+
+# Tipos de fallo de una descarga
+ERROR_TIMEOUT = "tiempo_agotado"
+ERROR_CONNECTION = "conexion"
+ERROR_THROTTLED = "limitado"          # HTTP 429
+ERROR_SERVER = "servidor"             # HTTP 5xx
+ERROR_NOT_PDF = "no_pdf"              # respuesta 200 que no es un PDF
+ERROR_INVALID_PDF = "pdf_invalido"    # PDF guardado truncado o dañado
+ERROR_SESSION = "sesion_caducada"     # redirección al inicio de sesión, 401 o 403
+ERROR_CLIENT = "cliente"              # otros 4xx
+ERROR_BROWSER = "navegador"           # ningún método del navegador obtuvo el PDF
+ERROR_UNKNOWN = "desconocido"
+
+# Intentos máximos por tipo de fallo (incluido el primero)
+DEFAULT_MAX_ATTEMPTS = {
+    ERROR_TIMEOUT: 4,
+    ERROR_CONNECTION: 4,
+    ERROR_THROTTLED: 5,
+    ERROR_SERVER: 4,
+    ERROR_NOT_PDF: 2,
+    ERROR_INVALID_PDF: 3,
+    ERROR_SESSION: 1,   # reintentar con la misma sesión no sirve
+    ERROR_CLIENT: 1,
+    ERROR_BROWSER: 2,
+    ERROR_UNKNOWN: 1,
+}
+
+# Fallos que indican que el portal está saturado y hay que bajar el ritmo
+OVERLOAD_ERRORS = (ERROR_THROTTLED, ERROR_SERVER, ERROR_TIMEOUT)
+
+
+class RetryPolicy:
+    """
+    Decide si se reintenta una descarga y cuánto se espera antes del siguiente intento.
+    """
+
+    def __init__(self, max_attempts=None, base_delay=0.5, max_delay=30.0):
+        self.max_attempts = dict(DEFAULT_MAX_ATTEMPTS, **(max_attempts or {}))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.random = random.Random()
+
+    def should_retry(self, error, attempt):
+        """
+        Indica si se debe reintentar tras el intento número attempt (empezando en 1).
+        """
+        return attempt < self.max_attempts.get(error, 1)
+
+    def delay(self, attempt):
+        """
+        Espera antes del intento attempt + 1: aleatoria entre 0 y base * 2^(attempt - 1), con un máximo.
+        """
+        return self.random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class AdaptiveRateLimiter:
+    """
+    Limita las peticiones por segundo y ajusta el límite según las respuestas del portal.
+    
+    Es seguro entre hilos: los hilos del grupo de descargas llaman a acquire()
+    antes de cada petición y a record() con el resultado.
+    
+    Args:
+        rate: Peticiones por segundo iniciales
+        min_rate, max_rate: Límites del ritmo
+        increase: Factor de aumento tras una respuesta rápida
+        decrease: Factor de reducción tras un 429, 5xx, tiempo agotado o pico de latencia
+        spike_factor: Una respuesta es un pico si tarda más que spike_factor veces la media
+        min_spike: Segundos por encima de la media por debajo de los cuales no se considera pico
+    """
+
+    def __init__(self, rate, min_rate=0.2, max_rate=20.0, increase=1.1, decrease=0.5,
+                 spike_factor=3.0, min_spike=0.5):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.spike_factor = spike_factor
+        self.min_spike = min_spike
+        self.average_latency = None
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Espera hasta el siguiente turno libre según el ritmo actual.
+        """
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + 1.0 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
+
+    def record(self, latency, error=None):
+        """
+        Ajusta el ritmo con el resultado de una petición.
+        
+        Args:
+            latency: Duración de la petición en segundos
+            error: Tipo de fallo o None si la petición tuvo éxito
+        """
+        with self.lock:
+            spike = (self.average_latency is not None
+                     and latency > self.spike_factor * self.average_latency
+                     and latency - self.average_latency > self.min_spike)
+            if error in OVERLOAD_ERRORS or spike:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+            elif error is None:
+                self.rate = min(self.max_rate, self.rate * self.increase)
+            
+            # Media móvil exponencial de la latencia (los picos no la desplazan de golpe)
+            if self.average_latency is None:
+                self.average_latency = latency
+            else:
+                self.average_latency = 0.8 * self.average_latency + 0.2 * latency
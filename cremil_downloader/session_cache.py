@@ -0,0 +1,111 @@
+"""
+Caché cifrada de las cookies de sesión del portal, por usuario y con caducidad.
+
+Las cookies se cifran con Fernet (paquete cryptography) usando una clave
+derivada de la contraseña del usuario con PBKDF2, de modo que el archivo no
+sirve sin la contraseña. Si cryptography no está instalado la caché queda
+desactivada y cada ejecución inicia sesión con el navegador.
+"""
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # Dependencia opcional
+    Fernet = None
+    InvalidToken = ValueError
+
+# Vigencia máxima de una sesión guardada (en segundos)
+DEFAULT_SESSION_TTL = 12 * 3600
+
+# Directorio de la caché (fuera del directorio de descarga)
+SESSION_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cremil_downloader", "sesiones")
+
+# Parámetros de derivación de la clave
+KDF_ITERATIONS = 200000
+SALT_SIZE = 16
+
+
+def is_available():
+    """
+    Indica si está instalada la dependencia de cifrado.
+    """
+    return Fernet is not None
+
+
+class SessionCache:
+    """
+    Guarda y recupera las cookies de una sesión autenticada, un archivo por usuario.
+    """
+
+    def __init__(self, cache_dir=SESSION_CACHE_DIR, ttl=DEFAULT_SESSION_TTL):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+
+    def path_for(self, username):
+        # El nombre del archivo no revela el usuario
+        name = hashlib.sha256(username.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.cache_dir, f"{name}.sesion")
+
+    @staticmethod
+    def derive_key(password, salt):
+        key = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, KDF_ITERATIONS)
+        return base64.urlsafe_b64encode(key)
+
+    def save(self, username, password, cookies, user_agent):
+        """
+        Cifra y guarda las cookies del navegador (lista de diccionarios de Selenium).
+        """
+        salt = os.urandom(SALT_SIZE)
+        payload = json.dumps({"cookies": cookies, "user_agent": user_agent, "saved": time.time()})
+        token = Fernet(self.derive_key(password, salt)).encrypt(payload.encode("utf-8"))
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for(username)
+        # Archivo temporal único (mkstemp lo crea con permisos 0600): varios procesos del
+        # modo por lotes pueden guardar a la vez la sesión del mismo usuario
+        fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path), suffix=".part", dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(salt + token)
+            os.replace(temp_path, path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def load(self, username, password):
+        """
+        Devuelve las cookies guardadas del usuario, o None si no hay sesión, caducó
+        o no se puede descifrar con la contraseña indicada.
+        
+        Returns:
+            Diccionario con cookies, user_agent y saved (marca de tiempo), o None
+        """
+        path = self.path_for(username)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        
+        salt, token = data[:SALT_SIZE], data[SALT_SIZE:]
+        try:
+            payload = Fernet(self.derive_key(password, salt)).decrypt(token, ttl=int(self.ttl))
+            return json.loads(payload)
+        except (InvalidToken, ValueError):
+            # Sesión caducada, contraseña distinta o archivo dañado
+            self.clear(username)
+            return None
+
+    def clear(self, username):
+        try:
+            os.remove(self.path_for(username))
+        except OSError:
+            pass